@@ -1,11 +1,16 @@
 import customtkinter as ctk
 import tkinter as tk
+import tkinter.messagebox
 from PIL import Image, ImageTk, ImageDraw
-import json
+import bisect
+import cProfile
 import os
 import threading
-from collections import defaultdict
-from modules.export import FilterDialog, MergeDialog
+import time
+from collections import Counter, defaultdict
+# Feature packages import their submodules on first use, see their __init__
+from modules import cache, dataset, export, formats, grid, qa
+from modules.profiling import profiler
 
 class ObjectDetectionViewer(ctk.CTk):
     def __init__(self):
@@ -20,12 +25,24 @@ class ObjectDetectionViewer(ctk.CTk):
         self.annotations = []
         self.categories = {}  # {id: {name: str, count: int}}
         self.image_annotations = defaultdict(list)  # {image_id: [annotations]}
+        self.image_class_counts = {}  # {image_id: {category_id: count}}
         self._current_image = None # original image
+        self.image_levels = []  # original image followed by reduced copies, largest first
         self.current_image = None # resized image
         self.photo_image = None
         self.resize_factor = 1.0
         self.zoom_factor = 1.0
-        self.class_checkboxes = {}
+        self.class_checkboxes = {}  # {category_id: BooleanVar}
+        self.class_checkbox_widgets = {}  # {category_id: CTkCheckBox}, pooled across images
+        self.sidebar_counts = {}  # {category_id: count} currently shown in the sidebar
+        self.sidebar_labels = {}  # {category_id: checkbox text} currently shown in the sidebar
+        self.sidebar_key = None  # (image id, score threshold) the sidebar currently shows
+
+        # Score threshold, annotations of every image are kept sorted by descending score
+        self.score_threshold = 0.0
+        self.class_scores = {}  # {category_id: ascending score array} over the dataset
+        self.all_scores = None  # ascending score array of all annotations
+        self.score_layers = []  # [{'anns', 'tags', 'cut'}] of annotation lists drawn on the canvas
         self.visible_classes = set()
         self.selected_box = None
         self.loaded_dataset = False
@@ -33,13 +50,54 @@ class ObjectDetectionViewer(ctk.CTk):
         self._image_min_height = 720
         self._image_min_width = 1280
         self.hovered_box = None  # Track the currently hovered box
-        self.metadata_popup = None
+        self.box_tag_annotations = {}  # {box_tag: annotation} of boxes drawn on the canvas
+        self.tooltip_bg = None  # Canvas items of the reusable metadata tooltip
+        self.tooltip_text = None
+        self.box_tag_status = {}  # {box_tag: match status} while comparing with predictions
+
+        # Predictions compared against the ground truth
+        self.prediction_annotations = {}  # {image_id: [annotations]}
+        self.comparison = None  # Result of evaluate_predictions, None when not comparing
+        self.comparison_iou_threshold = None
+        self.match_colors = {"TP": "#48F90A", "FP": "#FF3838", "FN": "#FFB21D"}
+
+        # Extra annotation sets drawn over the same decoded image
+        self.annotation_sets = []  # [{'name', 'image_annotations', 'dash', 'visible', 'checkbox'}]
+        self.set_categories = {}  # {category_id: name} of set classes missing from the dataset
+        self.box_tag_sets = {}  # {box_tag: set name} of boxes drawn from annotation sets
+        self.set_dashes = [(8, 4), (2, 3), (12, 3, 3, 3), (4, 4, 1, 4)]
+        self.show_dataset_boxes = tk.BooleanVar(value=True)
+
+        # Open thumbnail grid, refreshed when the image list changes
+        self.grid_dialog = None
+
+        # Profiling overlay (F2) and cProfile capture of the next navigation (F3)
+        self.show_profiler_overlay = False
+        self.profiler_overlay = None
+        self.profile_next_navigation = False
+
+        # Images flagged by a QA analysis, stepped through with Up/Down
+        self.image_positions = {}  # {image_id: index in image_list}
+        self.flagged_positions = []  # sorted indices in image_list
+        self.flagged_annotations = set()  # annotation ids highlighted on the canvas
+        self.flagged_analysis = None  # 'predictions' or 'sets' when recomputed on watch reloads
 
-        # Add threading lock for popup operations
-        self.popup_lock = threading.Lock()
+        # Watch mode, the annotation file is reloaded incrementally when it changes
+        self.watch_enabled = tk.BooleanVar(value=False)
+        self.annotation_watcher = None
+        self.loaded_annotation_path = None
+        self.annotation_signature = None  # (mtime, size) of the loaded annotation file version
+        self.watch_poll_job = None
+        self.background_tasks = 0  # running run_in_background tasks, they read the dataset tables
+
+        # Optional disk cache of decoded pixels, ODV_PIXEL_CACHE_MB caps its size
+        self.pixel_cache_enabled = tk.BooleanVar(value=False)
+        self.pixel_cache = None
 
         # dataset info
-        self.dataset_format_options = ["COCO"]
+        self.dataset_format_options = formats.format_names()
+        self.dataset_format = tk.StringVar(value=self.dataset_format_options[0])
+        self.loaded_format = None  # format of the loaded dataset, used by reloads and exports
         self.image_path = None
         self.annotation_path = None
 
@@ -69,14 +127,46 @@ class ObjectDetectionViewer(ctk.CTk):
         self.canvas = tk.Canvas(self.canvas_frame, bg='gray20', highlightthickness=0)
         self.canvas.grid(row=2, column=1, sticky="nsew")
         
-        # Create right sidebar for class checkboxes
-        self.sidebar = ctk.CTkScrollableFrame(self, width=250)
-        self.sidebar.grid(row=2, column=3, sticky="nsew", padx=10, pady=10)
+        # Create right sidebar with score threshold and class checkboxes
+        self.sidebar_frame = ctk.CTkFrame(self)
+        self.sidebar_frame.grid(row=2, column=3, sticky="nsew", padx=10, pady=10)
+
+        self.threshold_label = ctk.CTkLabel(self.sidebar_frame, text="Score threshold: 0.00")
+        self.threshold_label.pack(padx=5, pady=(5, 0), anchor="w")
+        self.threshold_slider = ctk.CTkSlider(
+            self.sidebar_frame,
+            from_=0,
+            to=1,
+            number_of_steps=100,
+            command=self.on_score_threshold_change
+        )
+        self.threshold_slider.set(0)
+        self.threshold_slider.pack(fill="x", padx=5, pady=5)
+        self.threshold_count_label = ctk.CTkLabel(self.sidebar_frame, text="Boxes in dataset: -")
+        self.threshold_count_label.pack(padx=5, anchor="w")
+
+        # Annotation set toggles, shown once a set is added
+        self.sets_frame = ctk.CTkFrame(self.sidebar_frame)
+        ctk.CTkLabel(self.sets_frame, text="Annotation sets").pack(padx=5, anchor="w")
+        ctk.CTkCheckBox(
+            self.sets_frame,
+            text="Dataset (solid)",
+            variable=self.show_dataset_boxes,
+            command=self.draw_image_and_annotations
+        ).pack(padx=5, pady=2, anchor="w")
+
+        self.sidebar = ctk.CTkScrollableFrame(self.sidebar_frame, width=250)
+        self.sidebar.pack(fill="both", expand=True)
         
         # Bind events
         self.bind('<Left>', self.prev_image)
         self.bind('<Right>', self.next_image)
+        self.bind('<Up>', self.prev_flagged_image)
+        self.bind('<Down>', self.next_flagged_image)
+        self.bind('<F2>', self.toggle_profiler_overlay)
+        self.bind('<F3>', self.request_navigation_profile)
         self.canvas.bind('<Motion>', self.on_canvas_motion)  # Bind motion event
+        self.canvas.bind('<Leave>', self.on_canvas_leave)
         self.canvas.bind('<MouseWheel>', self.on_mousewheel)
 
         # Add pan bindings
@@ -96,6 +186,7 @@ class ObjectDetectionViewer(ctk.CTk):
         dataset_format_dd = ctk.CTkOptionMenu(
             self.load_frame,
             values=self.dataset_format_options,
+            variable=self.dataset_format,
             width=100
         )
         dataset_format_dd.grid(row=0, column=1, padx=5, pady=5)
@@ -148,6 +239,44 @@ class ObjectDetectionViewer(ctk.CTk):
         )
         self.load_btn.grid(row=0, column=8, padx=5, pady=5)
 
+        # Load predictions button
+        self.predictions_btn = ctk.CTkButton(
+            self.load_frame,
+            text="Load Predictions",
+            width=100,
+            command=self.load_predictions
+        )
+        self.predictions_btn.grid(row=0, column=9, padx=5, pady=5)
+
+        # Watch annotation file toggle
+        self.watch_switch = ctk.CTkSwitch(
+            self.load_frame,
+            text="Watch",
+            width=80,
+            variable=self.watch_enabled,
+            command=self.toggle_watch
+        )
+        self.watch_switch.grid(row=0, column=10, padx=5, pady=5)
+
+        # Decoded pixel cache toggle
+        self.pixel_cache_switch = ctk.CTkSwitch(
+            self.load_frame,
+            text="Pixel Cache",
+            width=80,
+            variable=self.pixel_cache_enabled,
+            command=self.toggle_pixel_cache
+        )
+        self.pixel_cache_switch.grid(row=0, column=11, padx=5, pady=5)
+
+        # Add annotation set button
+        self.add_set_btn = ctk.CTkButton(
+            self.load_frame,
+            text="Add Annotation Set",
+            width=100,
+            command=self.add_annotation_set
+        )
+        self.add_set_btn.grid(row=0, column=12, padx=5, pady=5)
+
         # Save and export frame
         self.save_frame = ctk.CTkFrame(self)
         self.save_frame.grid(row=1, column=0, columnspan=4, sticky="ew", padx=5, pady=5)
@@ -168,6 +297,74 @@ class ObjectDetectionViewer(ctk.CTk):
         )
         self.export_btn.pack(side="left", padx=5)
 
+        # Export splits button
+        self.split_btn = ctk.CTkButton(
+            self.save_frame,
+            text="Export Splits",
+            command=self.export_split_annotations
+        )
+        self.split_btn.pack(side="left", padx=5)
+
+        # Export crops button
+        self.crops_btn = ctk.CTkButton(
+            self.save_frame,
+            text="Export Crops",
+            command=self.export_crop_images
+        )
+        self.crops_btn.pack(side="left", padx=5)
+
+        # Export balanced subset button
+        self.balanced_btn = ctk.CTkButton(
+            self.save_frame,
+            text="Export Balanced",
+            command=self.export_balanced_annotations
+        )
+        self.balanced_btn.pack(side="left", padx=5)
+
+        # Thumbnail grid button
+        self.grid_btn = ctk.CTkButton(
+            self.save_frame,
+            text="Grid View",
+            command=self.open_thumbnail_grid
+        )
+        self.grid_btn.pack(side="left", padx=5)
+
+        # Validate dataset button
+        self.validate_btn = ctk.CTkButton(
+            self.save_frame,
+            text="Validate Dataset",
+            command=self.validate_dataset
+        )
+        self.validate_btn.pack(side="left", padx=5)
+
+        # Find duplicates button
+        self.duplicates_btn = ctk.CTkButton(
+            self.save_frame,
+            text="Find Duplicates",
+            command=self.find_duplicate_boxes
+        )
+        self.duplicates_btn.pack(side="left", padx=5)
+
+        # Flagged image navigation
+        ctk.CTkButton(
+            self.save_frame,
+            text="<",
+            width=30,
+            command=self.prev_flagged_image
+        ).pack(side="left", padx=(5, 0))
+        self.flagged_label = ctk.CTkLabel(self.save_frame, text="No flagged images")
+        self.flagged_label.pack(side="left", padx=5)
+        ctk.CTkButton(
+            self.save_frame,
+            text=">",
+            width=30,
+            command=self.next_flagged_image
+        ).pack(side="left", padx=(0, 5))
+
+        # Background task status
+        self.status_label = ctk.CTkLabel(self.save_frame, text="")
+        self.status_label.pack(side="right", padx=5)
+
         # Configure column weights for responsive layout
         self.load_frame.grid_columnconfigure(4, weight=1)
         self.load_frame.grid_columnconfigure(7, weight=1)   
@@ -207,41 +404,41 @@ class ObjectDetectionViewer(ctk.CTk):
         self.load_btn.configure(state=state)
         self.save_btn.configure(state=state)
         self.export_btn.configure(state=state)
+        self.split_btn.configure(state=state)
+        self.crops_btn.configure(state=state)
+        self.balanced_btn.configure(state=state)
+        self.validate_btn.configure(state=state)
+        self.grid_btn.configure(state=state)
+        self.duplicates_btn.configure(state=state)
+        self.predictions_btn.configure(state=state)
+        self.add_set_btn.configure(state=state)
 
     def load_dataset(self):     
         try:
             assert self.image_path, "Missing image folder path!"
             assert self.annotation_path, "Missing annotation file path!"
                 
-            # Load COCO format annotations
-            with open(self.annotation_path, 'r') as f:
-                coco_data = json.load(f)
-                
-            # Process categories
-            self.categories = {
-                cat['id']: {'name': cat['name'], 'count': 0} 
-                for cat in coco_data['categories']
-            }
-            
-            # Process images
-            self.images = {
-                img['id']: {
-                    'file_name': img['file_name'],
-                    'width': img['width'],
-                    'height': img['height']
-                }
-                for img in coco_data['images']
-            }
-            
-            # Process annotations
-            self.image_annotations.clear()
-            for ann in coco_data['annotations']:
-                self.image_annotations[ann['image_id']].append({
-                    'category_id': ann['category_id'],
-                    'bbox': ann['bbox'],  # [x, y, width, height]
-                    'score': ann.get('score', 1.0),
-                    'id': ann['id']
-                })
+            # Stop watching the previous dataset
+            self.stop_watch()
+
+            # Load COCO format annotations, the signature is taken first so writes during parsing are caught
+            self.loaded_format = self.dataset_format.get()
+            self.loaded_annotation_path = self.annotation_path
+            self.annotation_signature = dataset.file_signature(self.annotation_path)
+            with profiler.section("dataset_load"):
+                self.categories, self.images, self.image_annotations = formats.get_loader(self.loaded_format)(self.annotation_path)
+                indices = dataset.index_dataset(self.image_annotations)
+            self.image_class_counts = indices['image_class_counts']
+            self.class_scores = indices['class_scores']
+            self.all_scores = indices['all_scores']
+
+            # Sidebar row of each category
+            self.category_rows = {cat_id: row for row, cat_id in enumerate(self.categories)}
+
+            # Drop sidebar widgets of the previous dataset
+            self.reset_class_checkboxes()
+            total = dataset.count_above(self.all_scores, self.score_threshold)
+            self.threshold_count_label.configure(text=f"Boxes in dataset: {total}/{len(self.all_scores)}")
                 
             # Loaded dataset
             self.loaded_dataset = True
@@ -251,73 +448,333 @@ class ObjectDetectionViewer(ctk.CTk):
 
             # Set image list for navigation
             self.image_list = list(self.images.keys())
+            self.image_positions = {image_id: i for i, image_id in enumerate(self.image_list)}
             self.current_image_index = 0
+
+            # Drop QA results and predictions of the previous dataset
+            self.set_flagged_images([], set())
+            self.prediction_annotations = {}
+            self.comparison = None
+            self.clear_annotation_sets()
+            self.close_thumbnail_grid()
             
             # Update UI
             self.load_current_image()
+
+            if self.watch_enabled.get():
+                self.start_watch()
         except Exception as e:
             # Failed to load dataset
             self.loaded_dataset = False
             self.loaded_current_image = False
 
             # Create error popup
-            error_popup = ctk.CTkToplevel(self)
-            error_popup.title("Dataset Loading Error")
-            error_popup.geometry("400x200")
-            error_popup.attributes('-topmost', True)  # Keep window on top
-            error_popup.grab_set()  # Prevent interaction with main window until popup is closed
-            
-            # Error message label
-            ctk.CTkLabel(
-                error_popup, 
-                text=f"Error loading dataset:\n\n{str(e)}",
-                wraplength=350
-            ).pack(pady=20, padx=20)
-            
-            # OK button to close popup
-            ctk.CTkButton(
-                error_popup, 
-                text="OK", 
-                command=error_popup.destroy
-            ).pack(pady=10)
-        
-    def update_class_checkboxes(self):
-        # Clear existing checkboxes
-        for widget in self.sidebar.winfo_children():
-            widget.destroy()
-        
-        # Get current image annotations
-        current_image_id = self.image_list[self.current_image_index]
-        current_anns = self.image_annotations[current_image_id]
-        
-        # Count annotations per class for current image
-        class_counts = defaultdict(int)
-        for ann in current_anns:
-            class_counts[ann['category_id']] += 1
+            self.show_popup("Dataset Loading Error", f"Error loading dataset:\n\n{str(e)}")
+
+    # Watch mode functions
+    def toggle_watch(self):
+        if self.watch_enabled.get():
+            if self.loaded_dataset:
+                self.start_watch()
+        else:
+            self.stop_watch()
+
+    def start_watch(self):
+        self.stop_watch()
+        self.annotation_watcher = dataset.AnnotationWatcher(
+            self.loaded_annotation_path,
+            self.annotation_signature,
+            self.categories,
+            self.images,
+            self.image_annotations,
+            loader=formats.get_loader(self.loaded_format)
+        )
+        self.annotation_watcher.start()
+        self.watch_poll_job = self.after(500, self.poll_watch)
+
+    def stop_watch(self):
+        if self.watch_poll_job is not None:
+            self.after_cancel(self.watch_poll_job)
+            self.watch_poll_job = None
+        if self.annotation_watcher is not None:
+            self.annotation_watcher.stop()
+            self.annotation_watcher = None
+
+    def poll_watch(self):
+        # Changes wait in the watcher queue while background tasks read the dataset tables
+        if not self.background_tasks:
+            for diff in self.annotation_watcher.poll():
+                self.apply_dataset_changes(diff)
+        self.watch_poll_job = self.after(500, self.poll_watch)
+
+    def apply_dataset_changes(self, diff):
+        # Apply a diff of the annotation file without reloading the dataset
+        current_image_id = self.image_list[self.current_image_index] if self.image_list else None
+        flagged_image_ids = [self.image_list[position] for position in self.flagged_positions]
+        self.annotation_signature = diff['signature']
+
+        # Categories, pooled sidebar checkboxes are rebuilt when they change
+        if diff['categories'] is not None:
+            self.categories = diff['categories']
+            self.category_rows = {cat_id: row for row, cat_id in enumerate(self.categories)}
+            self.reset_class_checkboxes()
+
+        # Images, navigation order of kept images is preserved and new images are appended
+        for image_id in diff['removed_images']:
+            del self.images[image_id]
+            self.image_class_counts.pop(image_id, None)
+        self.images.update(diff['added_images'])
+        self.images.update(diff['changed_images'])
+        if diff['added_images'] or diff['removed_images']:
+            removed_images = set(diff['removed_images'])
+            self.image_list = [
+                image_id for image_id in self.image_list if image_id not in removed_images
+            ] + list(diff['added_images'])
+            self.image_positions = {image_id: i for i, image_id in enumerate(self.image_list)}
+
+        # Annotations of changed images arrive sorted by score, score arrays are rebuilt by the watcher
+        for image_id, anns in diff['annotations'].items():
+            if anns:
+                self.image_annotations[image_id] = anns
+            else:
+                self.image_annotations.pop(image_id, None)
+        self.image_class_counts.update(diff['image_class_counts'])
+        self.class_scores = diff['class_scores']
+        self.all_scores = diff['all_scores']
+        total = dataset.count_above(self.all_scores, self.score_threshold)
+        self.threshold_count_label.configure(text=f"Boxes in dataset: {total}/{len(self.all_scores)}")
+
+        if diff['categories'] is not None and self.set_categories:
+            self.remap_set_categories()
+        self.set_flagged_images(flagged_image_ids, self.flagged_annotations, self.flagged_analysis)
+
+        # Grid cells are indexed by position in the image list
+        if self.grid_dialog is not None and self.grid_dialog.winfo_exists():
+            self.grid_dialog.set_image_ids(self.images, self.image_list)
+
+        status = (
+            f"Annotations reloaded: +{len(diff['added_images'])} -{len(diff['removed_images'])} images, "
+            f"{len(diff['annotations'])} images with changed boxes"
+        )
+        self.status_label.configure(text=status)
+
+        # Comparisons were computed against the previous annotations
+        if self.comparison is not None or self.annotation_sets:
+            self.refresh_comparisons(status)
+
+        if not self.image_list:
+            # Every image was removed, nothing is drawn until images are added again
+            self.current_image_index = 0
+            self.loaded_current_image = False
+            self._current_image = None
+            self.current_image = None
+            self.image_levels = []
+            self.score_layers = []
+            self.reset_class_checkboxes()
+            self.canvas.delete("all")
+            return
+
+        if current_image_id not in self.image_positions:
+            # Current image was removed, show the one that took its place
+            self.go_to_image(min(self.current_image_index, len(self.image_list) - 1))
+            return
+
+        # Keep the current image, zoom and pan, and redraw only what changed
+        self.current_image_index = self.image_positions[current_image_id]
+        self.sidebar_key = None
+        if current_image_id in diff['changed_images']:
+            self.loaded_current_image = False
+            self.load_current_image(keep_pan=True)
+        elif current_image_id in diff['annotations'] or diff['categories'] is not None:
+            self.update_class_checkboxes()
+            self.draw_image_and_annotations()
+        else:
+            # Dataset counts in the sidebar may still have changed
+            self.update_class_checkboxes()
+        self.update_flagged_label()
+
+    # Pixel cache functions
+    def toggle_pixel_cache(self):
+        if self.pixel_cache_enabled.get():
+            max_mb = int(os.environ.get("ODV_PIXEL_CACHE_MB", 4096))
+            self.pixel_cache = cache.PixelCache(max_bytes=max_mb * 2**20)
+        else:
+            self.pixel_cache = None
+
+    def show_popup(self, title, message):
+        popup = ctk.CTkToplevel(self)
+        popup.title(title)
+        popup.geometry("400x200")
+        popup.attributes('-topmost', True)  # Keep window on top
+        popup.grab_set()  # Prevent interaction with main window until popup is closed
+
+        # Message label
+        ctk.CTkLabel(
+            popup,
+            text=message,
+            wraplength=350,
+            justify="left"
+        ).pack(pady=20, padx=20)
+
+        # OK button to close popup
+        ctk.CTkButton(
+            popup,
+            text="OK",
+            command=popup.destroy
+        ).pack(pady=10)
+
+    def show_report_popup(self, title, report):
+        # Scrollable read-only text for reports too long for a label
+        popup = ctk.CTkToplevel(self)
+        popup.title(title)
+        popup.geometry("600x500")
+        popup.attributes('-topmost', True)
+
+        textbox = ctk.CTkTextbox(popup, font=("Courier", 12), wrap="none")
+        textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        textbox.insert("1.0", report)
+        textbox.configure(state="disabled")
+
+        ctk.CTkButton(
+            popup,
+            text="OK",
+            command=popup.destroy
+        ).pack(pady=10)
+
+    def run_in_background(self, description, task, on_complete):
+        # Run task(progress_callback) in a worker thread and poll it from the Tk loop,
+        # Tk widgets must only be touched from the main thread
+        state = {'progress': None, 'result': None, 'error': None, 'done': False}
+
+        def progress_callback(done, total):
+            state['progress'] = (done, total)
+
+        def worker():
+            try:
+                state['result'] = task(progress_callback)
+            except Exception as e:
+                state['error'] = e
+            state['done'] = True
+
+        def poll():
+            if state['progress']:
+                done, total = state['progress']
+                self.status_label.configure(text=f"{description}: {done}/{total}")
+            if not state['done']:
+                self.after(100, poll)
+                return
+            self.background_tasks -= 1
+            self.status_label.configure(text="")
+            if state['error'] is not None:
+                self.show_popup(f"{description} Error", f"{description} failed:\n\n{state['error']}")
+            else:
+                on_complete(state['result'])
+
+        self.status_label.configure(text=f"{description}...")
+        self.background_tasks += 1
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
         
-        # Create new checkboxes
-        for cat_id, cat_info in self.categories.items():
-            count = class_counts[cat_id]
-            if count == 0:
-                continue
-            var = tk.BooleanVar(value=count > 0)
-            
+    def reset_class_checkboxes(self):
+        # Destroy pooled checkboxes, categories may differ between datasets
+        for checkbox in self.class_checkbox_widgets.values():
+            checkbox.destroy()
+        self.class_checkbox_widgets.clear()
+        self.class_checkboxes.clear()
+        self.sidebar_counts = {}
+        self.sidebar_labels = {}
+        self.sidebar_key = None
+        self.visible_classes.clear()
+
+    def get_class_checkbox(self, cat_id):
+        # Create the checkbox of a category on first use and keep it in the pool
+        if cat_id not in self.class_checkbox_widgets:
+            var = tk.BooleanVar(value=True)
             checkbox = ctk.CTkCheckBox(
                 self.sidebar,
-                text=f"{cat_info['name']} ({count})",
+                text=self.categories[cat_id]['name'],
                 text_color=self.get_color(cat_id),
                 variable=var,
-                command=lambda cid=cat_id: self.toggle_class_visibility(cid),
-                state="normal" if count > 0 else "disabled"
+                command=lambda cid=cat_id: self.toggle_class_visibility(cid)
             )
-            checkbox.pack(pady=2, anchor="w")
             self.class_checkboxes[cat_id] = var
-            
-            if count > 0:
+            self.class_checkbox_widgets[cat_id] = checkbox
+        return self.class_checkbox_widgets[cat_id]
+
+    def get_image_class_counts(self, image_id):
+        # Annotation counts per class above the score threshold
+        if self.score_threshold <= 0:
+            return self.image_class_counts.get(image_id, {})
+        anns = self.image_annotations.get(image_id, [])
+        return Counter(ann['category_id'] for ann in anns[:dataset.score_cut(anns, self.score_threshold)])
+
+    @profiler.timed("sidebar_update")
+    def update_class_checkboxes(self):
+        # A watch reload may have removed every image
+        if not self.image_list:
+            return
+
+        # Nothing to update when only zoom changed
+        current_image_id = self.image_list[self.current_image_index]
+        sidebar_key = (current_image_id, self.score_threshold)
+        if sidebar_key == self.sidebar_key:
+            return
+
+        # Get annotation counts per class for current image, undeclared class ids have no sidebar row
+        class_counts = {
+            cat_id: count for cat_id, count in self.get_image_class_counts(current_image_id).items()
+            if cat_id in self.categories
+        }
+
+        # Hide checkboxes of classes not present in current image
+        for cat_id in self.sidebar_counts.keys() - class_counts.keys():
+            self.class_checkbox_widgets[cat_id].grid_remove()
+            del self.sidebar_labels[cat_id]
+
+        # Show and relabel only the checkboxes whose counts changed
+        for cat_id, count in class_counts.items():
+            dataset_count = dataset.count_above(self.class_scores[cat_id], self.score_threshold)
+            text = f"{self.categories[cat_id]['name']} ({count}/{dataset_count})"
+            if self.sidebar_labels.get(cat_id) != text:
+                checkbox = self.get_class_checkbox(cat_id)
+                checkbox.configure(text=text)
+                if cat_id not in self.sidebar_counts:
+                    # Grid row follows category order so shown classes keep a stable order
+                    checkbox.grid(row=self.category_rows[cat_id], column=0, pady=2, sticky="w")
+                self.sidebar_labels[cat_id] = text
+
+            # Classes present in a newly shown image start visible
+            if cat_id not in self.visible_classes:
+                self.class_checkboxes[cat_id].set(True)
                 self.visible_classes.add(cat_id)
-            else:
-                self.visible_classes.discard(cat_id)
+
+        self.sidebar_counts = dict(class_counts)
+        self.sidebar_key = sidebar_key
     
+    def on_score_threshold_change(self, value):
+        self.score_threshold = round(value, 2)
+        self.threshold_label.configure(text=f"Score threshold: {self.score_threshold:.2f}")
+        if not self.loaded_dataset:
+            return
+
+        # Only boxes between the old and the new cut change state, no redraw
+        for layer in self.score_layers:
+            cut = dataset.score_cut(layer['anns'], self.score_threshold)
+            state = "normal" if cut > layer['cut'] else "hidden"
+            for box_tag in layer['tags'][min(cut, layer['cut']):max(cut, layer['cut'])]:
+                if box_tag is not None:
+                    self.canvas.itemconfigure(box_tag, state=state)
+            layer['cut'] = cut
+
+        # Hovered box may have been hidden
+        self.hovered_box = None
+        self.hide_box_metadata()
+
+        # Update image and dataset counts above the threshold
+        total = dataset.count_above(self.all_scores, self.score_threshold)
+        self.threshold_count_label.configure(text=f"Boxes in dataset: {total}/{len(self.all_scores)}")
+        self.update_class_checkboxes()
+
     def toggle_class_visibility(self, class_idx):
         if self.class_checkboxes[class_idx].get():
             self.visible_classes.add(class_idx)
@@ -325,12 +782,19 @@ class ObjectDetectionViewer(ctk.CTk):
             self.visible_classes.remove(class_idx)
         self.draw_image_and_annotations()
         
+    @profiler.timed("canvas_draw")
     def draw_image_and_annotations(self):
         if not self.current_image:
             return
             
         # Clear canvas
         self.canvas.delete("all")
+        self.profiler_overlay = None
+        self.box_tag_annotations = {}
+        self.box_tag_status = {}
+        self.box_tag_sets = {}
+        self.score_layers = []
+        self.hovered_box = None
         
         # Calculate center position with pan offset
         cx = self.canvas.winfo_width()//2 - self.current_image.width//2 + self.pan_offset_x
@@ -347,39 +811,128 @@ class ObjectDetectionViewer(ctk.CTk):
         # Draw annotations
         if self.image_list:
             current_image_id = self.image_list[self.current_image_index]
-            current_anns = self.image_annotations[current_image_id]
+            current_anns = self.image_annotations[current_image_id] if self.show_dataset_boxes.get() else []
+
+            # Boxes below the score threshold are drawn hidden so threshold changes
+            # only toggle the boxes between the old and the new cut
+            cut = dataset.score_cut(current_anns, self.score_threshold)
+            tags = []
+            self.score_layers.append({'anns': current_anns, 'tags': tags, 'cut': cut})
             
-            for ann in current_anns:
+            for i, ann in enumerate(current_anns):
                 if ann['category_id'] not in self.visible_classes:
+                    tags.append(None)
                     continue
-                    
-                # Convert COCO bbox [x, y, width, height] to [x1, y1, x2, y2]
-                x, y, w, h = ann['bbox']
-                x1, y1 = x * self.zoom_factor * self.resize_factor, y * self.zoom_factor * self.resize_factor
-                x2, y2 = (x + w) * self.zoom_factor * self.resize_factor, (y + h) * self.zoom_factor * self.resize_factor
-                
-                # Create unique tag for this box
+
+                # Unmatched ground truth is highlighted when comparing with predictions
                 box_tag = f"box_{ann['category_id']}_{ann['id']}"
-                
-                # Draw box with pan offset
-                self.canvas.create_rectangle(
-                    x1 + cx, y1 + cy, x2 + cx, y2 + cy,
-                    outline=self.get_color(ann['category_id']),
-                    width=2,
-                    tags=("box", box_tag)                
-                )
-                
-                # Draw label with pan offset
+                color = self.get_color(ann['category_id'])
+                if self.comparison is not None:
+                    matched = ann['id'] in self.comparison['matched_gt']
+                    self.box_tag_status[box_tag] = "Matched" if matched else "FN"
+                    if not matched:
+                        color = self.match_colors['FN']
+
                 category_name = self.categories[ann['category_id']]['name']
-                self.canvas.create_text(
-                    x1 + cx, y1 + cy - 5,
-                    text=f"{category_name} ({ann['category_id']})",
-                    fill=self.get_color(ann['category_id']),
-                    anchor="sw",
-                    tags=("box", box_tag)
+                self.draw_box(
+                    ann, box_tag, cx, cy, color,
+                    f"{category_name} ({ann['category_id']})",
+                    flagged=ann['id'] in self.flagged_annotations,
+                    hidden=i >= cut
                 )
+                tags.append(box_tag)
 
-    def load_current_image(self):
+            # Draw predictions colored by match status
+            if self.comparison is not None:
+                prediction_anns = self.prediction_annotations.get(current_image_id, [])
+                cut = dataset.score_cut(prediction_anns, self.score_threshold)
+                tags = []
+                self.score_layers.append({'anns': prediction_anns, 'tags': tags, 'cut': cut})
+
+                for i, ann in enumerate(prediction_anns):
+                    # Classes without ground truth in this image have no checkbox and stay visible
+                    if ann['category_id'] in self.sidebar_counts and ann['category_id'] not in self.visible_classes:
+                        tags.append(None)
+                        continue
+
+                    box_tag = f"pred_{ann['category_id']}_{ann['id']}"
+                    status = "TP" if ann['id'] in self.comparison['tp_predictions'] else "FP"
+                    self.box_tag_status[box_tag] = status
+
+                    category_name = self.categories.get(ann['category_id'], {'name': 'unknown'})['name']
+                    self.draw_box(
+                        ann, box_tag, cx, cy,
+                        self.match_colors[status],
+                        f"{status} {category_name} {ann['score']:.2f}",
+                        dash=(4, 2),
+                        hidden=i >= cut
+                    )
+                    tags.append(box_tag)
+
+            # Annotation sets share the image, each with its own dash pattern
+            for set_index, annotation_set in enumerate(self.annotation_sets):
+                if not annotation_set['visible'].get():
+                    continue
+                set_anns = annotation_set['image_annotations'].get(current_image_id, [])
+                cut = dataset.score_cut(set_anns, self.score_threshold)
+                tags = []
+                self.score_layers.append({'anns': set_anns, 'tags': tags, 'cut': cut})
+
+                for i, ann in enumerate(set_anns):
+                    if ann['category_id'] in self.sidebar_counts and ann['category_id'] not in self.visible_classes:
+                        tags.append(None)
+                        continue
+
+                    box_tag = f"set{set_index}_{ann['category_id']}_{ann['id']}"
+                    self.box_tag_sets[box_tag] = annotation_set['name']
+                    self.draw_box(
+                        ann, box_tag, cx, cy,
+                        self.get_color(ann['category_id']),
+                        f"{annotation_set['name']}: {self.get_category_name(ann['category_id'])}",
+                        dash=annotation_set['dash'],
+                        hidden=i >= cut
+                    )
+                    tags.append(box_tag)
+
+        # Recreate the tooltip on top of the freshly drawn items
+        self.create_box_tooltip()
+
+        # Refresh overlay once the timings of this frame are recorded
+        if self.show_profiler_overlay:
+            self.after_idle(self.update_profiler_overlay)
+
+    def draw_box(self, ann, box_tag, cx, cy, color, label, dash=(), flagged=False, hidden=False):
+        # Convert COCO bbox [x, y, width, height] to [x1, y1, x2, y2]
+        scale = self.zoom_factor * self.resize_factor
+        x, y, w, h = ann['bbox']
+        x1, y1 = x * scale, y * scale
+        x2, y2 = (x + w) * scale, (y + h) * scale
+
+        # Keep annotation of this box for the tooltip
+        self.box_tag_annotations[box_tag] = ann
+
+        # Draw box with pan offset, flagged boxes are thicker and dashed
+        self.canvas.create_rectangle(
+            x1 + cx, y1 + cy, x2 + cx, y2 + cy,
+            outline=color,
+            width=3 if flagged else 2,
+            dash=(6, 3) if flagged else dash,
+            state="hidden" if hidden else "normal",
+            tags=("box", box_tag)
+        )
+
+        # Draw label with pan offset
+        self.canvas.create_text(
+            x1 + cx, y1 + cy - 5,
+            text=label,
+            fill=color,
+            anchor="sw",
+            state="hidden" if hidden else "normal",
+            tags=("box", box_tag)
+        )
+
+    @profiler.timed("frame")
+    def load_current_image(self, keep_pan=False):
         if not self.image_list:
             return
         
@@ -388,25 +941,49 @@ class ObjectDetectionViewer(ctk.CTk):
             current_image_id = self.image_list[self.current_image_index]
             image_info = self.images[current_image_id]
             
-            # Load image file
+            # Load image file, open only reads the header
             image_path = os.path.join(self.image_path, image_info['file_name'])
-            self._current_image = Image.open(image_path)
+            self.image_levels = None
+            if self.pixel_cache is not None:
+                # Cached sources are mapped from disk instead of decoded
+                try:
+                    with profiler.section("image_decode"):
+                        self.image_levels = self.pixel_cache.open(image_path)
+                except (OSError, ValueError):
+                    # Cache file deleted or evicted underneath us, rebuilt on the next visit
+                    self.pixel_cache.invalidate(image_path)
+            if self.image_levels is None:
+                with profiler.section("image_open"):
+                    self._current_image = Image.open(image_path)
+                with profiler.section("image_decode"):
+                    self._current_image.load()
+                    self._current_image = cache.to_display_image(self._current_image)
+                self.image_levels = [self._current_image]
+            self._current_image = self.image_levels[0]
 
             # Resize the image to a minimum size
             w, h = self._current_image.size
             self.resize_factor = max(1.0 , min(self._image_min_height / h, self._image_min_width / w))
             
-            # Reset pan offset when loading new image
-            self.reset_pan()
+            # Reset pan offset when loading new image, reloads of the same image keep it
+            if not keep_pan:
+                self.reset_pan()
             
             # Set loaded current image
             self.loaded_current_image = True
             
         # Apply zoom
         new_size = tuple(int(dim * self.zoom_factor * self.resize_factor) for dim in self._current_image.size)
-        self.current_image = self._current_image.resize(new_size)
+        # Resize from the smallest cached level that is still at least the display size
+        source = next(
+            level for level in reversed(self.image_levels)
+            if (level.width >= new_size[0] and level.height >= new_size[1]) or level is self._current_image
+        )
+        with profiler.section("resize"):
+            self.current_image = source.resize(new_size)
         
-        self.photo_image = ImageTk.PhotoImage(self.current_image)
+        with profiler.section("photo_image"):
+            self.photo_image = ImageTk.PhotoImage(self.current_image)
 
         # Update class checkboxes
         self.update_class_checkboxes()
@@ -415,51 +992,169 @@ class ObjectDetectionViewer(ctk.CTk):
         self.draw_image_and_annotations()
         
 
+    # Profiling functions
+    def toggle_profiler_overlay(self, event=None):
+        self.show_profiler_overlay = not self.show_profiler_overlay
+        if self.show_profiler_overlay:
+            self.update_profiler_overlay()
+        elif self.profiler_overlay is not None:
+            self.canvas.delete(self.profiler_overlay)
+            self.profiler_overlay = None
+
+    def update_profiler_overlay(self):
+        if not self.show_profiler_overlay:
+            return
+
+        # Last timing of every section with its running p50/p95
+        last, summary = profiler.snapshot()
+        lines = [f"{'section':<16}{'last':>9}{'p50':>9}{'p95':>9}"]
+        for name, duration in last.items():
+            stats = summary[name]
+            lines.append(f"{name:<16}{duration * 1000:>9.2f}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}")
+        text = "\n".join(lines) + "\n(ms, F2 to hide)"
+
+        if self.profiler_overlay is None:
+            self.profiler_overlay = self.canvas.create_text(
+                10, 10,
+                text=text,
+                fill="yellow",
+                font=("Courier", 10),
+                anchor="nw",
+                tags=("profiler",)
+            )
+        else:
+            self.canvas.itemconfigure(self.profiler_overlay, text=text)
+        self.canvas.tag_raise(self.profiler_overlay)
+
+    def request_navigation_profile(self, event=None):
+        # Capture the next image navigation with cProfile
+        self.profile_next_navigation = True
+        self.status_label.configure(text="Profiling next navigation...")
+
     # Metadata functions
+    def create_box_tooltip(self):
+        # Hidden tooltip items, shown and updated in place while hovering boxes
+        self.tooltip_bg = self.canvas.create_rectangle(
+            0, 0, 0, 0,
+            fill="gray10",
+            outline="gray60",
+            state="hidden",
+            tags=("tooltip",)
+        )
+        self.tooltip_text = self.canvas.create_text(
+            0, 0,
+            fill="white",
+            anchor="nw",
+            justify="left",
+            state="hidden",
+            tags=("tooltip",)
+        )
+
     def hide_box_metadata(self):
-        # Hide the metadata popup if it exists
-        if self.metadata_popup is not None:
-            self.metadata_popup.destroy()
-            self.metadata_popup = None
-
-    def show_box_metadata(self, box_tag):  
-              
-        _, category_id, ann_id = box_tag.split("_")
-        category_id = int(category_id)
-        ann_id = int(ann_id)
-        
-        # Find annotation
-        current_image_id = self.image_list[self.current_image_index]
-        ann = next(a for a in self.image_annotations[current_image_id] 
-                  if a['id'] == ann_id)
-        
-        # Create popup window
-        self.metadata_popup = ctk.CTkToplevel(self)
-        self.metadata_popup.title("Box Metadata")
-        self.metadata_popup.geometry("300x200")
-        self.metadata_popup.attributes('-topmost', True)  # Keep window on top
-        
-        # Add metadata
-        ctk.CTkLabel(self.metadata_popup, text=f"Category: {self.categories[category_id]['name']}").pack(pady=5)
-        ctk.CTkLabel(self.metadata_popup, text=f"Bbox: {[round(x, 2) for x in ann['bbox']]}").pack(pady=5)
-        ctk.CTkLabel(self.metadata_popup, text=f"Annotation ID: {ann_id}").pack(pady=5)
-        
+        # Hide the metadata tooltip if it is shown
+        if self.tooltip_bg is not None:
+            self.canvas.itemconfigure("tooltip", state="hidden")
+
+    def show_box_metadata(self, box_tag):
+        ann = self.box_tag_annotations[box_tag]
+        category_id = ann['category_id']
+        x, y, w, h = ann['bbox']
+
+        # Update tooltip text
+        self.canvas.itemconfigure(
+            self.tooltip_text,
+            text="\n".join([
+                f"Category: {self.get_category_name(category_id)} ({category_id})",
+                f"Bbox: {[round(v, 2) for v in ann['bbox']]}",
+                f"Area: {round(w * h, 2)}",
+                f"Score: {round(ann['score'], 4)}",
+                f"Annotation ID: {ann['id']}",
+                f"Image ID: {self.image_list[self.current_image_index]}"
+            ] + ([f"Match: {self.box_tag_status[box_tag]}"] if box_tag in self.box_tag_status else [])
+              + ([f"Set: {self.box_tag_sets[box_tag]}"] if box_tag in self.box_tag_sets else []))
+        )
+        self.canvas.itemconfigure("tooltip", state="normal")
+        self.canvas.tag_raise("tooltip")
+
+    def move_box_metadata(self, x, y, offset=12, padding=4):
+        # Place tooltip next to the cursor, flipped to stay inside the canvas
+        x1, y1, x2, y2 = self.canvas.bbox(self.tooltip_text)
+        width, height = x2 - x1, y2 - y1
+        tx = x + offset
+        ty = y + offset
+        if tx + width + padding > self.canvas.winfo_width():
+            tx = x - offset - width
+        if ty + height + padding > self.canvas.winfo_height():
+            ty = y - offset - height
+        self.canvas.coords(self.tooltip_text, tx, ty)
+        self.canvas.coords(self.tooltip_bg, tx - padding, ty - padding, tx + width + padding, ty + height + padding)
+
     # Event functions
+    def go_to_image(self, index):
+        if self.profile_next_navigation:
+            self.profile_next_navigation = False
+            profile = cProfile.Profile()
+            profile.runcall(self.go_to_image, index)
+
+            # ODV_PROFILE_DIR selects where captures are written, default is the working directory
+            profile_path = os.path.join(
+                os.environ.get("ODV_PROFILE_DIR", os.getcwd()),
+                f"navigation_{time.strftime('%Y%m%d_%H%M%S')}.prof"
+            )
+            profile.dump_stats(profile_path)
+            self.status_label.configure(text=f"Profile written to {profile_path}")
+            return
+
+        self.current_image_index = index
+        self.loaded_current_image = False
+        self.reset_zoom_factor()
+        self.reset_pan()
+        self.load_current_image()
+        self.update_flagged_label()
+
     def next_image(self, event=None):
         if self.current_image_index < len(self.image_list) - 1:
-            self.current_image_index += 1
-            self.loaded_current_image = False
-            self.reset_zoom_factor()
-            self.reset_pan()
-            self.load_current_image()
+            self.go_to_image(self.current_image_index + 1)
             
     def prev_image(self, event=None):
         if self.current_image_index > 0:
-            self.current_image_index -= 1
-            self.loaded_current_image = False
-            self.reset_zoom_factor()
-            self.reset_pan()
-            self.load_current_image()
+            self.go_to_image(self.current_image_index - 1)
+
+    def set_flagged_images(self, image_ids, annotation_ids, analysis=None):
+        # Keep navigation positions of flagged images sorted for bisection
+        self.flagged_positions = sorted(
+            self.image_positions[image_id] for image_id in image_ids
+            if image_id in self.image_positions
+        )
+        self.flagged_annotations = annotation_ids
+        self.flagged_analysis = analysis
+        self.update_flagged_label()
+
+    def update_flagged_label(self):
+        if not self.flagged_positions:
+            self.flagged_label.configure(text="No flagged images")
+            return
+        position = bisect.bisect_left(self.flagged_positions, self.current_image_index)
+        if position < len(self.flagged_positions) and self.flagged_positions[position] == self.current_image_index:
+            self.flagged_label.configure(text=f"Flagged {position + 1}/{len(self.flagged_positions)}")
+        else:
+            self.flagged_label.configure(text=f"Flagged -/{len(self.flagged_positions)}")
+
+    def next_flagged_image(self, event=None):
+        if not self.loaded_dataset:
+            return
+        # First flagged image after the current one
+        position = bisect.bisect_right(self.flagged_positions, self.current_image_index)
+        if position < len(self.flagged_positions):
+            self.go_to_image(self.flagged_positions[position])
+
+    def prev_flagged_image(self, event=None):
+        if not self.loaded_dataset:
+            return
+        # Last flagged image before the current one
+        position = bisect.bisect_left(self.flagged_positions, self.current_image_index)
+        if position > 0:
+            self.go_to_image(self.flagged_positions[position - 1])
 
     def on_mousewheel(self, event):
         if not self.loaded_dataset:
@@ -487,18 +1182,21 @@ class ObjectDetectionViewer(ctk.CTk):
                 hovered_box = tags[1]
                 break
         
-        # If the hovered box has changed
-        # Lock to avoid race condition, where the window is changed before destroy 
-        # when mouse hovers rapidly across multipl boxes
-        if self.popup_lock.acquire(False):
-            if hovered_box != self.hovered_box:
-                # Hide current metadata popup
+        # Update tooltip text only if the hovered box has changed
+        if hovered_box != self.hovered_box:
+            self.hovered_box = hovered_box
+            if hovered_box:
+                self.show_box_metadata(hovered_box)
+            else:
                 self.hide_box_metadata()
-                self.hovered_box = hovered_box
-                # Show new metadata popup if hovering over a box
-                if hovered_box:
-                    self.show_box_metadata(hovered_box)
-            self.popup_lock.release()
+
+        # Follow the cursor while hovering a box
+        if hovered_box:
+            self.move_box_metadata(event.x, event.y)
+
+    def on_canvas_leave(self, event):
+        self.hovered_box = None
+        self.hide_box_metadata()
 
     def start_pan(self, event):
         if not self.loaded_dataset:
@@ -534,86 +1232,642 @@ class ObjectDetectionViewer(ctk.CTk):
         self.pan_offset_y = 0
     
 
+    # Grid functions
+    def open_thumbnail_grid(self):
+        if not self.loaded_dataset:
+            return
+
+        def get_annotations(image_id):
+            # Boxes above the score threshold, like the main canvas
+            anns = self.image_annotations.get(image_id, [])
+            return anns[:dataset.score_cut(anns, self.score_threshold)]
+
+        def on_select(index):
+            self.go_to_image(index)
+            self.focus_force()
+
+        self.close_thumbnail_grid()
+        self.grid_dialog = grid.ThumbnailGridDialog(
+            self,
+            self.images,
+            self.image_list,
+            self.image_path,
+            get_annotations,
+            self.get_color,
+            on_select
+        )
+
+    def close_thumbnail_grid(self):
+        if self.grid_dialog is not None and self.grid_dialog.winfo_exists():
+            self.grid_dialog.close()
+        self.grid_dialog = None
+
+    # Validation functions
+    def validate_dataset(self):
+        if not self.loaded_dataset:
+            return
+
+        report_path = tk.filedialog.asksaveasfilename(
+            title="Select validation report file",
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines files", "*.jsonl")],
+            confirmoverwrite=False  # Existing reports are resumed
+        )
+        if not report_path:
+            return
+        verify_decode = tk.messagebox.askyesno(
+            "Validate Dataset",
+            "Fully decode every image?\n\nThis finds truncated files but is much slower than header checks."
+        )
+
+        # Snapshot tables so navigation does not race with the scan
+        images = dict(self.images)
+        image_annotations = dict(self.image_annotations)
+        image_root = self.image_path
+
+        def on_complete(summary):
+            image_issues = ", ".join(f"{k}: {v}" for k, v in summary['image_issues'].items()) or "none"
+            box_issues = ", ".join(f"{k}: {v}" for k, v in summary['box_issues'].items()) or "none"
+            self.show_popup(
+                "Validation Report",
+                f"Checked {summary['images_checked']} images.\n\n"
+                f"Image issues: {image_issues}\n"
+                f"Box issues: {box_issues}\n\n"
+                f"Report: {report_path}"
+            )
+
+        self.run_in_background(
+            "Validating",
+            lambda progress_callback: qa.scan_dataset(
+                images, image_annotations, image_root, report_path,
+                verify_decode=verify_decode,
+                progress_callback=progress_callback
+            ),
+            on_complete
+        )
+
+    def find_duplicate_boxes(self):
+        if not self.loaded_dataset:
+            return
+
+        dialog = ctk.CTkInputDialog(text="IoU threshold for duplicate boxes (0-1):", title="Find Duplicates")
+        value = dialog.get_input()
+        if not value:
+            return
+        try:
+            iou_threshold = float(value)
+            assert 0 < iou_threshold <= 1
+        except (ValueError, AssertionError):
+            self.show_popup("Find Duplicates Error", f"Invalid IoU threshold: {value}")
+            return
+        class_agnostic = tk.messagebox.askyesno(
+            "Find Duplicates",
+            "Also compare boxes of different classes?"
+        )
+
+        image_annotations = dict(self.image_annotations)
+
+        def on_complete(duplicates):
+            clusters = [cluster for image_clusters in duplicates.values() for cluster in image_clusters]
+            self.set_flagged_images(
+                list(duplicates.keys()),
+                {ann_id for cluster in clusters for ann_id in cluster}
+            )
+            self.draw_image_and_annotations()
+            self.show_popup(
+                "Duplicate Boxes",
+                f"Found {len(clusters)} duplicate clusters "
+                f"({sum(len(cluster) for cluster in clusters)} boxes) in {len(duplicates)} images "
+                f"at IoU >= {iou_threshold}.\n\n"
+                "Duplicates are drawn dashed. Use Up/Down or the arrow buttons to step through flagged images."
+            )
+
+        self.run_in_background(
+            "Finding duplicates",
+            lambda progress_callback: qa.find_duplicates(
+                image_annotations, iou_threshold, class_agnostic,
+                progress_callback=progress_callback
+            ),
+            on_complete
+        )
+
+    # Comparison functions
+    def load_predictions(self):
+        if not self.loaded_dataset:
+            return
+
+        prediction_path = tk.filedialog.askopenfilename(
+            title="Select COCO prediction file",
+            filetypes=[("JSON files", "*.json")]
+        )
+        if not prediction_path:
+            return
+
+        dialog = ctk.CTkInputDialog(text="IoU threshold for matching predictions (0-1):", title="Load Predictions")
+        value = dialog.get_input()
+        if not value:
+            return
+        try:
+            iou_threshold = float(value)
+            assert 0 < iou_threshold <= 1
+        except (ValueError, AssertionError):
+            self.show_popup("Load Predictions Error", f"Invalid IoU threshold: {value}")
+            return
+
+        image_annotations = dict(self.image_annotations)
+        image_ids = list(self.image_list)
+        prediction_loader = formats.get_prediction_loader(self.loaded_format)
+
+        def task(progress_callback):
+            prediction_annotations = dataset.sort_by_score(prediction_loader(prediction_path))
+            comparison = qa.evaluate_predictions(image_annotations, prediction_annotations, image_ids, iou_threshold)
+            return prediction_annotations, comparison
+
+        def on_complete(result):
+            self.prediction_annotations, self.comparison = result
+            self.comparison_iou_threshold = iou_threshold
+            self.set_flagged_images(self.comparison['error_images'], set(), 'predictions')
+            self.draw_image_and_annotations()
+            self.show_report_popup("Prediction Comparison", self.format_comparison_report(iou_threshold))
+
+        self.run_in_background("Comparing predictions", task, on_complete)
+
+    def format_comparison_report(self, iou_threshold):
+        per_class = self.comparison['per_class']
+        lines = [
+            f"IoU threshold: {iou_threshold}",
+            f"Images with errors: {len(self.comparison['error_images'])} (use Up/Down to step through them)",
+            "",
+            f"{'Class':<30}{'TP':>8}{'FP':>8}{'FN':>8}{'Precision':>11}{'Recall':>8}"
+        ]
+        for cat_id, stats in per_class.items():
+            name = self.categories.get(cat_id, {'name': f'unknown ({cat_id})'})['name']
+            lines.append(
+                f"{name[:29]:<30}{stats['tp']:>8}{stats['fp']:>8}{stats['fn']:>8}"
+                f"{stats['precision']:>11.3f}{stats['recall']:>8.3f}"
+            )
+
+        # Totals over all classes
+        tp = sum(stats['tp'] for stats in per_class.values())
+        fp = sum(stats['fp'] for stats in per_class.values())
+        fn = sum(stats['fn'] for stats in per_class.values())
+        lines.append(
+            f"{'All':<30}{tp:>8}{fp:>8}{fn:>8}"
+            f"{(tp / (tp + fp) if tp + fp else 0.0):>11.3f}{(tp / (tp + fn) if tp + fn else 0.0):>8.3f}"
+        )
+        return "\n".join(lines)
+
+    def refresh_comparisons(self, status):
+        # Re-run prediction matching and set disagreements on the reloaded annotations,
+        # the images flagged by either analysis are rebuilt from the new results
+        image_annotations = dict(self.image_annotations)
+        image_ids = list(self.image_list)
+        prediction_annotations = self.prediction_annotations if self.comparison is not None else None
+        iou_threshold = self.comparison_iou_threshold
+        set_tables = [annotation_set['image_annotations'] for annotation_set in self.annotation_sets]
+        signature = self.annotation_signature
+
+        def task(progress_callback):
+            comparison = None
+            if prediction_annotations is not None:
+                comparison = qa.evaluate_predictions(
+                    image_annotations, prediction_annotations, image_ids, iou_threshold
+                )
+            disagreements = None
+            if set_tables:
+                disagreements = qa.find_set_disagreements(image_ids, [image_annotations] + set_tables)
+            return comparison, disagreements
+
+        def on_complete(result):
+            # Results are stale when another version, dataset or prediction file was loaded meanwhile
+            if self.annotation_signature != signature:
+                return
+            comparison, disagreements = result
+            if comparison is not None and self.prediction_annotations is prediction_annotations:
+                self.comparison = comparison
+                if self.flagged_analysis == 'predictions':
+                    self.set_flagged_images(comparison['error_images'], set(), 'predictions')
+            current_tables = [annotation_set['image_annotations'] for annotation_set in self.annotation_sets]
+            if disagreements is not None and len(current_tables) == len(set_tables) and all(
+                current is table for current, table in zip(current_tables, set_tables)
+            ):
+                if self.flagged_analysis == 'sets':
+                    self.set_flagged_images(disagreements['class_mismatch'], set(), 'sets')
+            self.draw_image_and_annotations()
+            self.status_label.configure(text=status)
+
+        self.run_in_background("Updating comparisons", task, on_complete)
+
+    # Annotation sets functions
+    def add_annotation_set(self):
+        if not self.loaded_dataset:
+            return
+
+        annotation_path = tk.filedialog.askopenfilename(
+            title="Select annotation file to overlay",
+            filetypes=[("JSON files", "*.json")]
+        )
+        if not annotation_path:
+            return
+
+        loader = formats.get_loader(self.loaded_format)
+        name = os.path.splitext(os.path.basename(annotation_path))[0]
+        image_ids = list(self.image_list)
+        file_image_ids = {info['file_name']: image_id for image_id, info in self.images.items()}
+        category_ids = {info['name']: cat_id for cat_id, info in self.categories.items()}
+        category_ids.update({cat_name: cat_id for cat_id, cat_name in self.set_categories.items()})
+        compared_sets = [dict(self.image_annotations)] + [
+            annotation_set['image_annotations'] for annotation_set in self.annotation_sets
+        ]
+
+        def task(progress_callback):
+            categories, images, image_annotations = loader(annotation_path)
+
+            # Classes are matched by name. Classes missing from the dataset get temporary
+            # negative ids, fresh ids are allocated on completion
+            category_mapping = {}
+            new_categories = {}  # {temporary id: name}
+            for cat_id, info in categories.items():
+                if info['name'] not in category_ids:
+                    category_ids[info['name']] = -1 - len(new_categories)
+                    new_categories[category_ids[info['name']]] = info['name']
+                category_mapping[cat_id] = category_ids[info['name']]
+
+            # Images are matched by file name, annotations are copied only when their class id changes
+            set_annotations = {}
+            new_category_annotations = []  # copies carrying temporary class ids
+            unmatched_images = 0
+            for set_image_id, anns in image_annotations.items():
+                image_id = file_image_ids.get(images.get(set_image_id, {}).get('file_name'))
+                if image_id is None:
+                    unmatched_images += 1
+                    continue
+                mapped_anns = []
+                for ann in anns:
+                    if ann['category_id'] not in category_mapping:
+                        # Undeclared classes are never kept under their raw id
+                        cat_name = f"class {ann['category_id']}"
+                        if cat_name not in category_ids:
+                            category_ids[cat_name] = -1 - len(new_categories)
+                            new_categories[category_ids[cat_name]] = cat_name
+                        category_mapping[ann['category_id']] = category_ids[cat_name]
+                    cat_id = category_mapping[ann['category_id']]
+                    if cat_id != ann['category_id']:
+                        ann = {**ann, 'category_id': cat_id}
+                        if cat_id < 0:
+                            new_category_annotations.append(ann)
+                    mapped_anns.append(ann)
+                set_annotations[image_id] = mapped_anns
+            dataset.sort_by_score(set_annotations)
+
+            disagreements = qa.find_set_disagreements(image_ids, compared_sets + [set_annotations])
+            return set_annotations, new_categories, new_category_annotations, disagreements, unmatched_images
+
+        def on_complete(result):
+            set_annotations, new_categories, new_category_annotations, disagreements, unmatched_images = result
+
+            # Fresh ids are allocated here, on the Tk thread, so sets loaded at the same time never share ids
+            known_ids = {info['name']: cat_id for cat_id, info in self.categories.items()}
+            known_ids.update({cat_name: cat_id for cat_id, cat_name in self.set_categories.items()})
+            next_category_id = max(list(self.categories) + list(self.set_categories), default=-1) + 1
+            final_ids = {}
+            for temporary_id, cat_name in new_categories.items():
+                if cat_name not in known_ids:
+                    known_ids[cat_name] = next_category_id
+                    self.set_categories[next_category_id] = cat_name
+                    next_category_id += 1
+                final_ids[temporary_id] = known_ids[cat_name]
+            for ann in new_category_annotations:
+                ann['category_id'] = final_ids[ann['category_id']]
+
+            dash = self.set_dashes[len(self.annotation_sets) % len(self.set_dashes)]
+            visible = tk.BooleanVar(value=True)
+            checkbox = ctk.CTkCheckBox(
+                self.sets_frame,
+                text=f"{name} ({'-'.join(map(str, dash))} dashes)",
+                variable=visible,
+                command=self.draw_image_and_annotations
+            )
+            checkbox.pack(padx=5, pady=2, anchor="w")
+            if not self.annotation_sets:
+                self.sets_frame.pack(fill="x", padx=5, pady=5, before=self.sidebar)
+            self.annotation_sets.append({
+                'name': name,
+                'image_annotations': set_annotations,
+                'dash': dash,
+                'visible': visible,
+                'checkbox': checkbox
+            })
+
+            # Images where any set disagrees are stepped through with Up/Down
+            self.set_flagged_images(disagreements['class_mismatch'], set(), 'sets')
+            self.draw_image_and_annotations()
+            self.status_label.configure(
+                text=f"Sets differ in box count on {len(disagreements['count_mismatch'])} images, "
+                     f"in class histogram on {len(disagreements['class_mismatch'])} images"
+                     + (f", {unmatched_images} set images not in dataset" if unmatched_images else "")
+            )
+
+        self.run_in_background("Loading annotation set", task, on_complete)
+
+    def remap_set_categories(self):
+        # The reloaded dataset may now declare a set class by name or reuse its id
+        category_ids = {info['name']: cat_id for cat_id, info in self.categories.items()}
+        next_category_id = max(list(self.categories) + list(self.set_categories), default=-1) + 1
+        category_mapping = {}
+        set_categories = {}
+        for cat_id, cat_name in self.set_categories.items():
+            new_id = category_ids.get(cat_name, cat_id)
+            if cat_name not in category_ids:
+                if cat_id in self.categories:
+                    new_id = next_category_id
+                    next_category_id += 1
+                set_categories[new_id] = cat_name
+            if new_id != cat_id:
+                category_mapping[cat_id] = new_id
+        self.set_categories = set_categories
+        if not category_mapping:
+            return
+
+        for annotation_set in self.annotation_sets:
+            set_annotations = annotation_set['image_annotations']
+            for image_id, anns in set_annotations.items():
+                set_annotations[image_id] = [
+                    {**ann, 'category_id': category_mapping[ann['category_id']]}
+                    if ann['category_id'] in category_mapping else ann
+                    for ann in anns
+                ]
+
+    def clear_annotation_sets(self):
+        for annotation_set in self.annotation_sets:
+            annotation_set['checkbox'].destroy()
+        self.annotation_sets = []
+        self.set_categories = {}
+        self.show_dataset_boxes.set(True)
+        self.sets_frame.pack_forget()
+
     # Export functions
+    def select_export_categories(self, on_complete):
+        # Filter then merge classes, on_complete receives the resulting category mapping
+        def on_filter_complete(filtered_categories):
+            def on_merge_complete(merge_groups):
+                category_mapping, new_categories = export.build_category_mapping(
+                    self.categories, filtered_categories, merge_groups
+                )
+                on_complete(category_mapping, new_categories)
+
+            # Show merge dialog after filtering
+            merge_dialog = export.MergeDialog(self, self.categories, filtered_categories, on_merge_complete)
+            merge_dialog.grab_set()
+
+        # Show filter dialog first
+        filter_dialog = export.FilterDialog(self, self.categories, on_filter_complete)
+        filter_dialog.grab_set()
+
     def export_annotations(self):
         if not self.image_list:
             return
-            
-        def on_filter_complete(filtered_categories):
-            def on_merge_complete(merge_groups):
+
+        def on_categories_selected(category_mapping, new_categories):
+            def on_options_selected(options):
                 # Open file dialog
                 filename = tk.filedialog.asksaveasfilename(
                     defaultextension=".json",
                     filetypes=[("JSON files", "*.json")]
                 )
-                
+
                 if not filename:
                     return
-                    
-                # Create category mapping for merged categories
-                category_mapping = {}
-                old_categories = filtered_categories.copy()
-                new_categories = {}
-                next_category_id = 0
-                
-                # Add merged categories
-                for group in merge_groups:
-                    for old_cat_id in group['categories']:
-                        category_mapping[old_cat_id] = next_category_id
-                        # Remove old category if it's being merged
-                        old_categories.remove(old_cat_id)
-                    new_categories[next_category_id] = group['new_name']
-                    next_category_id += 1
 
-                # Filtered categories that are not merged
-                for old_cat_id in old_categories:
-                    category_mapping[old_cat_id] = next_category_id # continue with new category id
-                    new_categories[next_category_id] = self.categories[old_cat_id]['name']
-                    next_category_id += 1
-                
-                # Create COCO format data with merged and filtered categories
-                export_data = {
-                    'images': [
-                        {
-                            'id': img_id,
-                            'file_name': img_info['file_name'],
-                            'width': img_info['width'],
-                            'height': img_info['height']
-                        }
-                        for img_id, img_info in self.images.items()
-                    ],
-                    'categories': [
-                        {
-                            'id': cat_id,
-                            'name': cat_name
-                        }
-                        for cat_id, cat_name in new_categories.items()
-                    ],
-                    'annotations': [
-                        {
-                            'id': ann['id'], # should be changed to continuos id after filtering and merging
-                            'image_id': img_id,
-                            'category_id': category_mapping[ann['category_id']],
-                            'bbox': ann['bbox'],
-                            'score': ann['score']
-                        }
-                        for img_id, anns in self.image_annotations.items()
-                        for ann in anns
-                        if ann['category_id'] in category_mapping
-                    ]
-                }
-                
-                # Save to file
-                with open(filename, 'w') as f:
-                    json.dump(export_data, f, indent=2)
-            
-            # Show merge dialog after filtering
-            merge_dialog = MergeDialog(self, self.categories, filtered_categories, on_merge_complete)
-            merge_dialog.grab_set()
-        
-        # Show filter dialog first
-        filter_dialog = FilterDialog(self, self.categories, on_filter_complete)
-        filter_dialog.grab_set()
+                exporter = formats.get_exporter(self.loaded_format)
+                images = dict(self.images)
+                image_annotations = dict(self.image_annotations)
+                image_root = self.image_path
+                image_dir = os.path.join(os.path.dirname(filename), "images")
+                copy_mode = options.pop('copy_images')
+
+                def task(progress_callback):
+                    file_names = exporter(
+                        images, image_annotations, category_mapping, new_categories, filename, **options
+                    )
+                    summary = {'images': len(file_names)}
+                    if copy_mode:
+                        summary.update(export.copy_images(
+                            file_names, image_root, image_dir, copy_mode == "hardlink",
+                            progress_callback=progress_callback
+                        ))
+                    return summary
+
+                def on_complete(summary):
+                    if not copy_mode:
+                        self.status_label.configure(text=f"Exported {summary['images']} images to {filename}")
+                        return
+                    self.show_popup(
+                        "Export Complete",
+                        f"Exported {summary['images']} images to {filename}\n\n"
+                        f"Images in {image_dir}:\n"
+                        f"copied {summary['copied']}, linked {summary['linked']}, "
+                        f"already present {summary['skipped']}, missing {summary['missing']}"
+                    )
+
+                self.run_in_background("Exporting", task, on_complete)
+
+            options_dialog = export.ExportOptionsDialog(self, on_options_selected)
+            options_dialog.grab_set()
+
+        self.select_export_categories(on_categories_selected)
+
+    def export_split_annotations(self):
+        if not self.image_list:
+            return
+
+        def on_categories_selected(category_mapping, new_categories):
+            dialog = ctk.CTkInputDialog(
+                text="Split ratios as train,val or train,val,test (e.g. 0.8,0.1,0.1):",
+                title="Export Splits"
+            )
+            value = dialog.get_input()
+            if not value:
+                return
+            try:
+                ratios = [float(ratio) for ratio in value.split(",")]
+                assert len(ratios) in (2, 3) and min(ratios) >= 0 and sum(ratios) > 0
+            except (ValueError, AssertionError):
+                self.show_popup("Export Splits Error", f"Invalid split ratios: {value}")
+                return
+            split_names = ["train", "val", "test"][:len(ratios)]
+
+            dialog = ctk.CTkInputDialog(text="Random seed:", title="Export Splits")
+            value = dialog.get_input()
+            if value is None:
+                return
+            try:
+                seed = int(value or 0)
+            except ValueError:
+                self.show_popup("Export Splits Error", f"Invalid seed: {value}")
+                return
+
+            # Split files are named after the selected file, e.g. annotations_train.json
+            filename = tk.filedialog.asksaveasfilename(
+                title="Select base name of the split files",
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json")]
+            )
+            if not filename:
+                return
+            root, ext = os.path.splitext(filename)
+            filename_template = f"{root}_{{split}}{ext}"
+
+            exporter = formats.get_exporter(self.loaded_format)
+            images = dict(self.images)
+            image_annotations = dict(self.image_annotations)
+
+            def on_complete(report):
+                self.show_report_popup("Split Export", self.format_split_report(report, split_names))
+
+            self.run_in_background(
+                "Exporting splits",
+                lambda progress_callback: export.export_splits(
+                    images, image_annotations, category_mapping, new_categories,
+                    ratios, split_names, filename_template, seed, exporter
+                ),
+                on_complete
+            )
+
+        self.select_export_categories(on_categories_selected)
+
+    def format_split_report(self, report, split_names):
+        lines = [f"{name}: {report['images'][name]} images -> {report['files'][name]}" for name in split_names]
+        lines.append("")
+        lines.append(f"{'Class':<30}" + "".join(f"{name:>10}" for name in split_names))
+        for counts in report['classes'].values():
+            lines.append(
+                f"{counts['name'][:29]:<30}" +
+                "".join(f"{counts['boxes'][name]:>10}" for name in split_names)
+            )
+        return "\n".join(lines)
+
+    def export_crop_images(self):
+        if not self.image_list:
+            return
+
+        def on_categories_selected(category_mapping, new_categories):
+            dialog = ctk.CTkInputDialog(
+                text="Padding around every box as a fraction of its size (e.g. 0.1):",
+                title="Export Crops"
+            )
+            value = dialog.get_input()
+            if value is None:
+                return
+            try:
+                padding = float(value or 0)
+                assert padding >= 0
+            except (ValueError, AssertionError):
+                self.show_popup("Export Crops Error", f"Invalid padding: {value}")
+                return
+
+            dialog = ctk.CTkInputDialog(text="Minimum box width and height in pixels:", title="Export Crops")
+            value = dialog.get_input()
+            if value is None:
+                return
+            try:
+                min_size = float(value or 1)
+            except ValueError:
+                self.show_popup("Export Crops Error", f"Invalid minimum size: {value}")
+                return
+
+            output_dir = tk.filedialog.askdirectory(title="Select output folder of the crops")
+            if not output_dir:
+                return
+
+            images = dict(self.images)
+            image_annotations = dict(self.image_annotations)
+
+            def on_complete(summary):
+                lines = [
+                    f"Manifest: {summary['manifest']}",
+                    f"Boxes below minimum size: {summary['skipped_boxes']}",
+                    f"Unreadable images: {summary['failed_images']}",
+                    ""
+                ]
+                lines += [f"{name[:29]:<30}{count:>10}" for name, count in sorted(summary['crops'].items())]
+                self.show_report_popup("Crop Export", "\n".join(lines))
+
+            self.run_in_background(
+                "Exporting crops",
+                lambda progress_callback: export.export_crops(
+                    images, image_annotations, category_mapping, new_categories, self.image_path, output_dir,
+                    padding, min_size, progress_callback=progress_callback
+                ),
+                on_complete
+            )
+
+        self.select_export_categories(on_categories_selected)
+
+    def export_balanced_annotations(self):
+        if not self.image_list:
+            return
+
+        def on_categories_selected(category_mapping, new_categories):
+            dialog = ctk.CTkInputDialog(
+                text="Cap per class, optionally followed by per-class caps (e.g. 1000, car=5000):",
+                title="Export Balanced Subset"
+            )
+            value = dialog.get_input()
+            if not value:
+                return
+            category_ids = {name: cat_id for cat_id, name in new_categories.items()}
+            try:
+                default_cap, *overrides = [part.strip() for part in value.split(",")]
+                default_cap = float(default_cap)
+                class_caps = {}
+                for override in overrides:
+                    name, cap = override.rsplit("=", 1)
+                    class_caps[category_ids[name.strip()]] = float(cap)
+            except (ValueError, KeyError):
+                self.show_popup("Export Balanced Subset Error", f"Invalid caps: {value}")
+                return
+
+            dialog = ctk.CTkInputDialog(text="Caps count boxes or images (boxes/images):", title="Export Balanced Subset")
+            value = dialog.get_input()
+            if value is None:
+                return
+            if value.strip().lower() not in ("", "boxes", "images"):
+                self.show_popup("Export Balanced Subset Error", f"Invalid cap unit: {value}")
+                return
+            count_images = value.strip().lower() == "images"
+
+            filename = tk.filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json")]
+            )
+            if not filename:
+                return
+
+            exporter = formats.get_exporter(self.loaded_format)
+            images = dict(self.images)
+            image_annotations = dict(self.image_annotations)
+
+            def on_complete(report):
+                lines = [f"{report['images']} images -> {report['file']}", ""]
+                lines.append(f"{'Class':<30}{'boxes':>16}{'images':>16}")
+                for counts in report['classes'].values():
+                    lines.append(
+                        f"{counts['name'][:29]:<30}"
+                        f"{counts['boxes_kept']:>7}/{counts['boxes']:<8}{counts['images_kept']:>7}/{counts['images']:<8}"
+                    )
+                self.show_report_popup("Balanced Subset Export", "\n".join(lines))
+
+            self.run_in_background(
+                "Exporting balanced subset",
+                lambda progress_callback: export.export_balanced_subset(
+                    images, image_annotations, category_mapping, new_categories, default_cap, filename,
+                    class_caps, count_images, exporter=exporter
+                ),
+                on_complete
+            )
+
+        self.select_export_categories(on_categories_selected)
 
     def save_current_image(self):
         if not self.current_image:
@@ -628,14 +1882,17 @@ class ObjectDetectionViewer(ctk.CTk):
         if not filename:
             return
             
-        # Create new image with annotations
-        img_draw = self._current_image.copy()
+        # Create new image with annotations, cached pixels are padded RGBX
+        if self._current_image.mode == "RGBX":
+            img_draw = self._current_image.convert("RGB")
+        else:
+            img_draw = self._current_image.copy()
         draw = ImageDraw.Draw(img_draw)
         
         current_image_id = self.image_list[self.current_image_index]
         current_anns = self.image_annotations[current_image_id]
         
-        for ann in current_anns:
+        for ann in current_anns[:dataset.score_cut(current_anns, self.score_threshold)]:
             if ann['category_id'] not in self.visible_classes:
                 continue
                 
@@ -653,6 +1910,12 @@ class ObjectDetectionViewer(ctk.CTk):
         img_draw.save(filename)
 
 
+    def get_category_name(self, category_id):
+        # Dataset classes first, then classes only found in annotation sets
+        if category_id in self.categories:
+            return self.categories[category_id]['name']
+        return self.set_categories.get(category_id, 'unknown')
+
     # Color functions
     def get_color(self, category_id):
         # Generate consistent color for each category
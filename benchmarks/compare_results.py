@@ -0,0 +1,46 @@
+import argparse
+import json
+
+def flatten_results(results):
+    # {name: result}, GUI results are prefixed with gui.
+    flat = {name: result for name, result in results.items() if name != 'gui'}
+    for name, result in results.get('gui', {}).items():
+        if name != 'skipped':
+            flat[f"gui.{name}"] = result
+    return flat
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=1.1,
+                        help="time ratio above which a benchmark counts as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    if baseline['metadata']['params'] != candidate['metadata']['params']:
+        print("Warning: benchmark parameters differ, results are not comparable")
+
+    old = flatten_results(baseline['results'])
+    new = flatten_results(candidate['results'])
+    regressions = []
+    print(f"{'benchmark':<34}{'baseline ms':>12}{'candidate ms':>14}{'ratio':>8}{'peak MB':>16}")
+    for name in sorted(old.keys() & new.keys()):
+        ratio = new[name]['min_s'] / old[name]['min_s'] if old[name]['min_s'] else float('inf')
+        marker = " <- regression" if ratio > args.threshold else ""
+        if marker:
+            regressions.append(name)
+        print(
+            f"{name:<34}{old[name]['min_s'] * 1000:>12.2f}{new[name]['min_s'] * 1000:>14.2f}{ratio:>8.2f}"
+            f"{old[name]['peak_mb']:>9.1f}/{new[name]['peak_mb']:<6.1f}{marker}"
+        )
+
+    # Non-zero exit lets CI fail on regressions
+    raise SystemExit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from PIL import Image
+
+from benchmarks.startup_benchmark import measure_startup
+from benchmarks.synthetic_dataset import generate_dataset
+from modules.dataset import index_dataset, load_coco
+from modules.export import build_category_mapping, build_export_data, save_export_data
+
+def measure(fn, repeat):
+    # Wall time over repeats, then peak Python memory of one extra traced run
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'min_s': min(times),
+        'mean_s': sum(times) / len(times),
+        'repeat': repeat,
+        'peak_mb': peak / 2**20
+    }
+
+def load_dataset_tables(annotation_path):
+    # Same parsing and indexing as ObjectDetectionViewer.load_dataset
+    categories, images, image_annotations = load_coco(annotation_path)
+    index_dataset(image_annotations)
+    return categories, images, image_annotations
+
+def run_core_benchmarks(annotation_path, image_dir, repeat):
+    results = {}
+    results['load_dataset'] = measure(lambda: load_dataset_tables(annotation_path), repeat)
+    categories, images, image_annotations = load_dataset_tables(annotation_path)
+
+    # Decode and resize like ObjectDetectionViewer.load_current_image
+    image_path = os.path.join(image_dir, sorted(os.listdir(image_dir))[0])
+
+    def decode():
+        with Image.open(image_path) as img:
+            img.load()
+
+    results['image_decode'] = measure(decode, repeat)
+
+    with Image.open(image_path) as img:
+        img.load()
+        w, h = img.size
+        resize_factor = max(1.0, min(720 / h, 1280 / w))
+        new_size = (int(w * resize_factor), int(h * resize_factor))
+        results['image_resize'] = measure(lambda: img.resize(new_size), repeat)
+        results['image_resize_zoomed'] = measure(lambda: img.resize((new_size[0] * 2, new_size[1] * 2)), repeat)
+
+    # Export with every category kept and no merges
+    category_mapping, new_categories = build_category_mapping(categories, set(categories), [])
+    results['export_build'] = measure(
+        lambda: build_export_data(images, image_annotations, category_mapping, new_categories),
+        repeat
+    )
+    export_data = build_export_data(images, image_annotations, category_mapping, new_categories)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        export_path = os.path.join(tmp_dir, "export.json")
+        results['export_serialize'] = measure(lambda: save_export_data(export_data, export_path), repeat)
+
+    return results
+
+def run_gui_benchmarks(annotation_path, image_dir, repeat):
+    # Needs a display, run under a virtual one on headless machines: xvfb-run python -m benchmarks.run_benchmarks
+    import tkinter as tk
+    try:
+        from app import ObjectDetectionViewer
+        viewer = ObjectDetectionViewer()
+    except tk.TclError as e:
+        return {'skipped': f"no display available ({e})"}
+
+    try:
+        viewer.image_path = image_dir
+        viewer.annotation_path = annotation_path
+        viewer.load_dataset()
+        viewer.update()
+        if not viewer.loaded_dataset:
+            return {'skipped': "viewer failed to load the dataset"}
+
+        results = {}
+
+        def draw():
+            viewer.draw_image_and_annotations()
+            viewer.update_idletasks()
+
+        results['draw_image_and_annotations'] = measure(draw, repeat)
+
+        # Sweep the cursor over a grid of canvas positions
+        width, height = viewer.canvas.winfo_width(), viewer.canvas.winfo_height()
+        events = [
+            SimpleNamespace(x=x, y=y)
+            for y in range(0, height, max(1, height // 20))
+            for x in range(0, width, max(1, width // 20))
+        ]
+
+        def hover():
+            for event in events:
+                viewer.on_canvas_motion(event)
+
+        results['hover_hit_test'] = measure(hover, repeat)
+        results['hover_hit_test']['events'] = len(events)
+
+        # Full navigation step: decode, resize, PhotoImage, sidebar and draw
+        def navigate():
+            if viewer.current_image_index == len(viewer.image_list) - 1:
+                viewer.go_to_image(0)
+            else:
+                viewer.next_image()
+            viewer.update_idletasks()
+
+        results['navigate'] = measure(navigate, repeat)
+        return results
+    finally:
+        viewer.destroy()
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def get_max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 2**20 if sys.platform == "darwin" else max_rss / 2**10
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dataset loading, drawing and export")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--images", type=int, default=5000)
+    parser.add_argument("--boxes", type=int, default=50, help="boxes per image")
+    parser.add_argument("--categories", type=int, default=80)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--image-files", type=int, default=4, help="distinct image files, reused cyclically")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-gui", action="store_true", help="skip benchmarks that need a display")
+    args = parser.parse_args()
+
+    params = {
+        'images': args.images,
+        'boxes_per_image': args.boxes,
+        'categories': args.categories,
+        'width': args.width,
+        'height': args.height,
+        'image_files': args.image_files,
+        'repeat': args.repeat,
+        'seed': args.seed
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        annotation_path, image_dir = generate_dataset(
+            tmp_dir, args.images, args.boxes, args.categories, args.width, args.height,
+            args.image_files, args.seed, with_scores=True
+        )
+        results = run_core_benchmarks(annotation_path, image_dir, args.repeat)
+        if args.no_gui:
+            results['gui'] = {'skipped': "disabled with --no-gui"}
+        else:
+            results['gui'] = run_gui_benchmarks(annotation_path, image_dir, args.repeat)
+
+    # Cold startup in fresh processes, time to first window needs a display
+    startup = measure_startup(args.repeat, open_window='skipped' not in results['gui'])
+    results['startup_import'] = startup['startup_import']
+    results['gui'].update({name: result for name, result in startup['gui'].items() if name != 'skipped'})
+
+    output = {
+        'metadata': {
+            'commit': get_commit(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': params
+        },
+        'results': results,
+        'max_rss_mb': get_max_rss_mb()
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+
+    for name, result in results.items():
+        if name == 'gui':
+            continue
+        print(f"{name:<30}{result['min_s'] * 1000:>10.2f} ms{result['peak_mb']:>10.1f} MB")
+    for name, result in results['gui'].items():
+        if name == 'skipped':
+            print(f"gui benchmarks skipped: {result}")
+        else:
+            print(f"{name:<30}{result['min_s'] * 1000:>10.2f} ms{result['peak_mb']:>10.1f} MB")
+
+if __name__ == "__main__":
+    main()
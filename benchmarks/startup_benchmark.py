@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def startup_child(open_window):
+    # Runs in a fresh interpreter so every import is cold
+    start = time.perf_counter()
+    import app
+    result = {'import_s': time.perf_counter() - start}
+
+    if open_window:
+        import tkinter as tk
+        try:
+            viewer = app.ObjectDetectionViewer()
+            viewer.update()
+            result['first_window_s'] = time.perf_counter() - start
+            viewer.destroy()
+        except tk.TclError as e:
+            result['skipped'] = f"no display available ({e})"
+
+    from benchmarks.run_benchmarks import get_max_rss_mb
+    result['max_rss_mb'] = get_max_rss_mb()
+    print(json.dumps(result))
+
+def summarize(times, peak_mb):
+    # Same fields as benchmarks.run_benchmarks.measure, peak memory is the child's max RSS
+    return {
+        'min_s': min(times),
+        'mean_s': sum(times) / len(times),
+        'repeat': len(times),
+        'peak_mb': peak_mb
+    }
+
+def measure_startup(repeat, open_window=True):
+    # Time to import the viewer and to show its first window, each run in a new process
+    runs = []
+    for _ in range(repeat):
+        command = [sys.executable, "-m", "benchmarks.startup_benchmark", "--child"]
+        if not open_window:
+            command.append("--no-gui")
+        output = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    peak_mb = max(run['max_rss_mb'] or 0 for run in runs)
+    results = {'startup_import': summarize([run['import_s'] for run in runs], peak_mb)}
+    if not open_window:
+        results['gui'] = {'skipped': "disabled with --no-gui"}
+    elif 'skipped' in runs[0]:
+        results['gui'] = {'skipped': runs[0]['skipped']}
+    else:
+        results['gui'] = {'time_to_first_window': summarize([run['first_window_s'] for run in runs], peak_mb)}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold startup time of the viewer")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-gui", action="store_true", help="only measure imports")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        startup_child(not args.no_gui)
+        return
+
+    results = measure_startup(args.repeat, not args.no_gui)
+    print(f"{'startup_import':<30}{results['startup_import']['min_s'] * 1000:>10.2f} ms")
+    for name, result in results['gui'].items():
+        if name == 'skipped':
+            print(f"gui benchmarks skipped: {result}")
+        else:
+            print(f"{name:<30}{result['min_s'] * 1000:>10.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+
+import numpy as np
+from PIL import Image
+
+def generate_annotations(num_images, boxes_per_image, num_categories, width, height, image_files, seed=0,
+                         with_scores=False):
+    # COCO dataset with uniformly random boxes, images reference image_files files cyclically
+    rng = np.random.default_rng(seed)
+    num_boxes = num_images * boxes_per_image
+
+    # Box sizes between 2% and 40% of the image, fully inside the image
+    w = rng.uniform(0.02, 0.4, num_boxes) * width
+    h = rng.uniform(0.02, 0.4, num_boxes) * height
+    x = rng.uniform(0, 1, num_boxes) * (width - w)
+    y = rng.uniform(0, 1, num_boxes) * (height - h)
+    bboxes = np.round(np.stack([x, y, w, h], axis=1), 2).tolist()
+    category_ids = rng.integers(0, num_categories, num_boxes).tolist()
+    scores = np.round(rng.uniform(0, 1, num_boxes), 4).tolist()
+
+    annotations = []
+    for i in range(num_boxes):
+        ann = {
+            'id': i + 1,
+            'image_id': i // boxes_per_image + 1,
+            'category_id': category_ids[i],
+            'bbox': bboxes[i],
+            'area': round(bboxes[i][2] * bboxes[i][3], 2),
+            'iscrowd': 0
+        }
+        if with_scores:
+            ann['score'] = scores[i]
+        annotations.append(ann)
+
+    return {
+        'images': [
+            {
+                'id': i + 1,
+                'file_name': f"image_{i % image_files:06d}.jpg",
+                'width': width,
+                'height': height
+            }
+            for i in range(num_images)
+        ],
+        'categories': [
+            {'id': i, 'name': f"class_{i}"}
+            for i in range(num_categories)
+        ],
+        'annotations': annotations
+    }
+
+def generate_images(image_dir, image_files, width, height, seed=0):
+    # Smooth random images, noise alone compresses unrealistically badly
+    rng = np.random.default_rng(seed)
+    os.makedirs(image_dir, exist_ok=True)
+    for i in range(image_files):
+        small = rng.integers(0, 256, (max(1, height // 32), max(1, width // 32), 3), dtype=np.uint8)
+        image = Image.fromarray(small).resize((width, height), Image.BILINEAR)
+        image.save(os.path.join(image_dir, f"image_{i:06d}.jpg"), quality=90)
+
+def generate_dataset(output_dir, num_images=1000, boxes_per_image=20, num_categories=80, width=1920, height=1080,
+                     image_files=16, seed=0, with_scores=False):
+    # Writes output_dir/annotations.json and output_dir/images/, returns both paths
+    os.makedirs(output_dir, exist_ok=True)
+    image_files = max(1, min(image_files, num_images))
+    annotation_path = os.path.join(output_dir, "annotations.json")
+    image_dir = os.path.join(output_dir, "images")
+
+    coco_data = generate_annotations(
+        num_images, boxes_per_image, num_categories, width, height, image_files, seed, with_scores
+    )
+    with open(annotation_path, 'w') as f:
+        json.dump(coco_data, f)
+    generate_images(image_dir, image_files, width, height, seed)
+
+    return annotation_path, image_dir
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic COCO dataset")
+    parser.add_argument("output_dir")
+    parser.add_argument("--images", type=int, default=1000, help="number of images in the annotation file")
+    parser.add_argument("--boxes", type=int, default=20, help="boxes per image")
+    parser.add_argument("--categories", type=int, default=80)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--image-files", type=int, default=16, help="distinct image files, reused cyclically")
+    parser.add_argument("--scores", action="store_true", help="add prediction scores to annotations")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_dataset(
+        args.output_dir, args.images, args.boxes, args.categories, args.width, args.height,
+        args.image_files, args.seed, args.scores
+    )
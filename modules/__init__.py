@@ -0,0 +1,13 @@
+import importlib
+import sys
+
+def lazy_exports(package_name, submodules):
+    # Module __getattr__ for a package __init__: a public name is imported from its
+    # submodule on first access and then cached as a package attribute
+    def __getattr__(name):
+        if name not in submodules:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(f".{submodules[name]}", package_name), name)
+        setattr(sys.modules[package_name], name, value)
+        return value
+    return __getattr__
@@ -0,0 +1,10 @@
+from modules import lazy_exports
+
+# numpy is only imported once the cache is enabled
+_submodules = {
+    "PixelCache": "pixel_cache_utils",
+    "to_display_image": "display_utils"
+}
+
+__all__ = list(_submodules)
+__getattr__ = lazy_exports(__name__, _submodules)
@@ -0,0 +1,13 @@
+from PIL import Image
+
+def to_display_image(img):
+    # 16-bit and float sources are scaled by their peak to 8-bit grayscale, the cached
+    # and the uncached viewer paths both convert through here and show the same pixels
+    if img.mode not in ('I;16', 'I;16B', 'I;16L', 'I', 'F'):
+        return img
+    if img.mode != 'F':
+        img = img.convert('I')
+    peak = img.getextrema()[1]
+    if peak > 0:
+        img = img.point(lambda value: value * (255.0 / peak))
+    return img.convert('L')
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from .display_utils import to_display_image
+
+# Decoded pixels are stored as raw .npy arrays, one directory per source path:
+#   <cache_dir>/<digest[:2]>/<digest>/<mtime_ns>_<size>_<level>.<mode>.npy
+# Level 0 is the full image, level n is reduced by 2**n. A changed source mtime or
+# size selects new file names, stale versions are deleted on the next lookup.
+
+def default_cache_dir():
+    # ODV_PIXEL_CACHE overrides the per-user cache directory
+    return os.environ.get(
+        "ODV_PIXEL_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "object-detection-dataset-visualizer", "pixels")
+    )
+
+def to_display_array(img):
+    # 8-bit array in a mode PIL can map without copying: L, RGBA or RGBX
+    img = to_display_image(img)
+    if img.mode in ('1', 'L'):
+        return np.ascontiguousarray(np.asarray(img.convert('L'))), 'L'
+    if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+        return np.ascontiguousarray(np.asarray(img.convert('RGBA'))), 'RGBA'
+    return np.ascontiguousarray(np.asarray(img.convert('RGBX'))), 'RGBX'
+
+def map_array(pixels, mode):
+    # PIL image sharing memory with the (memory-mapped) array
+    height, width = pixels.shape[:2]
+    return Image.frombuffer(mode, (width, height), pixels, 'raw', mode, 0, 1)
+
+class PixelCache:
+    # Disk cache of decoded pixels for slow-to-decode sources, least recently used
+    # files are evicted above max_bytes
+    def __init__(self, cache_dir=None, max_bytes=4 * 2**30, levels=2, formats=('TIFF', 'PNG'), min_pixels=2**20):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.levels = levels  # reduced levels stored next to the full image
+        self.formats = formats  # source formats worth caching, JPEG decodes fast enough
+        self.min_pixels = min_pixels
+        self.entries = {}  # {path: [size, last used]}
+        self.total_bytes = 0
+        self.scan()
+
+    def scan(self):
+        # Rebuild the LRU index from the files left by earlier sessions
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.endswith('.tmp'):
+                    os.remove(path)
+                    continue
+                stat = os.stat(path)
+                self.entries[path] = [stat.st_size, stat.st_mtime]
+                self.total_bytes += stat.st_size
+
+    def entry_dir(self, image_path):
+        digest = hashlib.sha1(os.path.abspath(image_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest)
+
+    def open(self, image_path):
+        # [full image, reduced levels...], mapped from the cache when possible
+        stat = os.stat(image_path)
+        entry_dir = self.entry_dir(image_path)
+        prefix = f"{stat.st_mtime_ns}_{stat.st_size}_"
+        names = os.listdir(entry_dir) if os.path.isdir(entry_dir) else []
+
+        # Cached levels of the current source version, in level order
+        cached = sorted(
+            (int(name[len(prefix):].split('.')[0]), name) for name in names
+            if name.startswith(prefix) and os.path.join(entry_dir, name) in self.entries
+        )
+        if cached and cached[0][0] == 0:
+            images = []
+            for _, name in cached:
+                path = os.path.join(entry_dir, name)
+                self.touch(path)
+                images.append(map_array(np.load(path, mmap_mode='r'), name.split('.')[-2]))
+            return images
+
+        # Source changed or never cached, drop stale versions
+        for name in names:
+            self.remove(os.path.join(entry_dir, name))
+
+        img = Image.open(image_path)
+        img.load()
+        if img.format not in self.formats or img.width * img.height < self.min_pixels:
+            return [to_display_image(img)]
+
+        pixels, mode = to_display_array(img)
+        img.close()
+        images = [map_array(pixels, mode)]
+        for _ in range(self.levels):
+            images.append(images[-1].reduce(2))
+
+        # All levels are written together, sources above the cap are not cached
+        arrays = [pixels] + [np.asarray(level) for level in images[1:]]
+        if sum(array.nbytes for array in arrays) <= self.max_bytes:
+            os.makedirs(entry_dir, exist_ok=True)
+            paths = [os.path.join(entry_dir, f"{prefix}{level}.{mode}.npy") for level in range(len(arrays))]
+            for path, array in zip(paths, arrays):
+                self.store(path, array)
+            self.evict(keep=set(paths))
+        return images
+
+    def store(self, path, pixels):
+        # Write to a temporary file first so readers never map partial arrays
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, pixels)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        self.entries[path] = [size, os.path.getmtime(path)]
+        self.total_bytes += size
+
+    def touch(self, path):
+        # File mtime doubles as last use time, so recency survives restarts
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        self.entries[path][1] = now
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Still mapped (Windows), the entry is kept so a later eviction retries it
+            return False
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.total_bytes -= entry[0]
+        return True
+
+    def invalidate(self, image_path):
+        # Forget all cached levels of a source, e.g. after a cache file was deleted or truncated
+        entry_dir = self.entry_dir(image_path)
+        for path in [path for path in self.entries if os.path.dirname(path) == entry_dir]:
+            self.remove(path)
+
+    def evict(self, keep=frozenset()):
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        # All levels of a source are evicted together, open() cannot use reduced levels alone
+        entry_paths = {}
+        for path in self.entries:
+            entry_paths.setdefault(os.path.dirname(path), []).append(path)
+        last_used = {
+            entry_dir: max(self.entries[path][1] for path in paths) for entry_dir, paths in entry_paths.items()
+        }
+        for entry_dir in sorted(entry_paths, key=last_used.get):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if not keep.isdisjoint(entry_paths[entry_dir]):
+                continue
+            for path in entry_paths[entry_dir]:
+                self.remove(path)
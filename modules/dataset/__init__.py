@@ -0,0 +1,16 @@
+from modules import lazy_exports
+
+# numpy is only imported once a dataset is loaded
+_submodules = {
+    "AnnotationWatcher": "watch_utils",
+    "count_above": "score_utils",
+    "file_signature": "watch_utils",
+    "index_dataset": "dataset_utils",
+    "load_coco": "coco_utils",
+    "load_coco_predictions": "coco_utils",
+    "score_cut": "score_utils",
+    "sort_by_score": "score_utils"
+}
+
+__all__ = list(_submodules)
+__getattr__ = lazy_exports(__name__, _submodules)
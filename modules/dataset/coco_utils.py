@@ -0,0 +1,50 @@
+import json
+from collections import defaultdict
+
+from modules.profiling import profiler
+
+def parse_coco_annotations(annotations):
+    # Group annotations by image
+    image_annotations = defaultdict(list)
+    for i, ann in enumerate(annotations):
+        image_annotations[ann['image_id']].append({
+            'category_id': ann['category_id'],
+            'bbox': ann['bbox'],  # [x, y, width, height]
+            'score': ann.get('score', 1.0),
+            'id': ann.get('id', i + 1)  # COCO result files have no annotation ids
+        })
+    return image_annotations
+
+def load_coco(annotation_path):
+    # Load COCO format annotations
+    with profiler.section("json_parse"), open(annotation_path, 'r') as f:
+        coco_data = json.load(f)
+
+    # Process categories
+    categories = {
+        cat['id']: {'name': cat['name'], 'count': 0}
+        for cat in coco_data['categories']
+    }
+
+    # Process images
+    images = {
+        img['id']: {
+            'file_name': img['file_name'],
+            'width': img['width'],
+            'height': img['height']
+        }
+        for img in coco_data['images']
+    }
+
+    # Process annotations
+    image_annotations = parse_coco_annotations(coco_data['annotations'])
+
+    return categories, images, image_annotations
+
+def load_coco_predictions(annotation_path):
+    # Either a full COCO file or a COCO results list of {image_id, category_id, bbox, score}
+    with profiler.section("json_parse"), open(annotation_path, 'r') as f:
+        coco_data = json.load(f)
+    if isinstance(coco_data, dict):
+        coco_data = coco_data['annotations']
+    return parse_coco_annotations(coco_data)
@@ -0,0 +1,21 @@
+from collections import Counter
+
+from .score_utils import build_all_scores, build_class_scores, sort_by_score
+
+def count_image_classes(image_annotations):
+    # {image_id: {category_id: count}} for every image
+    return {
+        image_id: dict(Counter(ann['category_id'] for ann in anns))
+        for image_id, anns in image_annotations.items()
+    }
+
+def index_dataset(image_annotations):
+    # Lookup tables the viewer derives from the annotations once per load.
+    # Annotations of every image are sorted by descending score in place
+    sort_by_score(image_annotations)
+    class_scores = build_class_scores(image_annotations)
+    return {
+        'image_class_counts': count_image_classes(image_annotations),
+        'class_scores': class_scores,
+        'all_scores': build_all_scores(class_scores)
+    }
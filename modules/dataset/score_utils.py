@@ -0,0 +1,44 @@
+import numpy as np
+
+def sort_by_score(image_annotations):
+    # Keep the annotations of every image sorted by descending score, in place
+    for anns in image_annotations.values():
+        anns.sort(key=lambda ann: ann['score'], reverse=True)
+    return image_annotations
+
+def score_cut(anns, threshold):
+    # Number of annotations with score >= threshold, found by binary search
+    # over annotations sorted by descending score
+    lo, hi = 0, len(anns)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if anns[mid]['score'] >= threshold:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def build_class_scores(image_annotations):
+    # {category_id: ascending score array} over the whole dataset
+    categories = np.fromiter(
+        (ann['category_id'] for anns in image_annotations.values() for ann in anns),
+        dtype=np.int64
+    )
+    scores = np.fromiter(
+        (ann['score'] for anns in image_annotations.values() for ann in anns),
+        dtype=np.float64
+    )
+    order = np.lexsort((scores, categories))
+    cat_ids, starts = np.unique(categories[order], return_index=True)
+    return {
+        cat_id: class_scores
+        for cat_id, class_scores in zip(cat_ids.tolist(), np.split(scores[order], starts[1:]))
+    }
+
+def build_all_scores(class_scores):
+    # Ascending score array of all annotations
+    return np.sort(np.concatenate([np.zeros(0)] + list(class_scores.values())))
+
+def count_above(class_scores, threshold):
+    # Number of scores >= threshold in an ascending score array
+    return len(class_scores) - int(np.searchsorted(class_scores, threshold, side='left'))
@@ -0,0 +1,115 @@
+import os
+import queue
+import threading
+import time
+
+from .coco_utils import load_coco
+from .dataset_utils import count_image_classes
+from .score_utils import build_all_scores, build_class_scores, sort_by_score
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def fingerprint_annotations(anns):
+    # Order-independent fingerprint of the annotations of one image
+    return hash(frozenset(
+        (ann['id'], ann['category_id'], tuple(ann['bbox']), ann['score'])
+        for ann in anns
+    ))
+
+def diff_dataset(old_categories, old_images, old_fingerprints, categories, images, image_annotations):
+    # Changes between two versions of a dataset, by image and annotation ids
+    fingerprints = {image_id: fingerprint_annotations(anns) for image_id, anns in image_annotations.items() if anns}
+    changed_annotations = {
+        image_id: image_annotations.get(image_id, [])
+        for image_id in old_fingerprints.keys() | fingerprints.keys()
+        if old_fingerprints.get(image_id) != fingerprints.get(image_id)
+    }
+    return {
+        'categories': categories if categories != old_categories else None,
+        'added_images': {image_id: images[image_id] for image_id in images.keys() - old_images.keys()},
+        'removed_images': list(old_images.keys() - images.keys()),
+        'changed_images': {
+            image_id: info for image_id, info in images.items()
+            if image_id in old_images and old_images[image_id] != info
+        },
+        'annotations': changed_annotations  # {image_id: new annotation list}
+    }, fingerprints
+
+def is_empty_diff(diff):
+    return (
+        diff['categories'] is None and not diff['added_images'] and not diff['removed_images']
+        and not diff['changed_images'] and not diff['annotations']
+    )
+
+class AnnotationWatcher:
+    # Polls an annotation file and parses new versions in a background thread,
+    # diffs are queued for the GUI thread to apply
+    def __init__(self, annotation_path, signature, categories, images, image_annotations, loader=load_coco,
+                 interval=2.0, settle=1.0):
+        self.annotation_path = annotation_path
+        self.loader = loader
+        self.signature = signature  # file signature of the loaded version
+        self.categories = categories
+        self.images = dict(images)
+        self.image_annotations = dict(image_annotations)  # only used for the initial fingerprints
+        self.interval = interval
+        self.settle = settle  # file must be unchanged this long before it is parsed
+        self.changes = queue.Queue()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def poll(self):
+        # Diffs queued since the last poll, oldest first
+        diffs = []
+        while True:
+            try:
+                diffs.append(self.changes.get_nowait())
+            except queue.Empty:
+                return diffs
+
+    def run(self):
+        fingerprints = {
+            image_id: fingerprint_annotations(anns)
+            for image_id, anns in self.image_annotations.items() if anns
+        }
+        self.image_annotations = None
+
+        while not self.stop_event.wait(self.interval):
+            try:
+                signature = file_signature(self.annotation_path)
+                if signature == self.signature:
+                    continue
+
+                # Labeling tools may still be writing, wait until the file settles
+                time.sleep(self.settle)
+                if file_signature(self.annotation_path) != signature:
+                    continue
+
+                categories, images, image_annotations = self.loader(self.annotation_path)
+            except (OSError, ValueError, KeyError):
+                # Missing or partially written file, retry on the next poll
+                continue
+
+            sort_by_score(image_annotations)
+            diff, fingerprints_new = diff_dataset(
+                self.categories, self.images, fingerprints, categories, images, image_annotations
+            )
+            self.signature = signature
+            if is_empty_diff(diff):
+                continue
+
+            # Dataset-wide score arrays are rebuilt here to keep the GUI thread free
+            diff['class_scores'] = build_class_scores(image_annotations)
+            diff['all_scores'] = build_all_scores(diff['class_scores'])
+            diff['image_class_counts'] = count_image_classes(diff['annotations'])
+            diff['signature'] = signature
+            self.categories, self.images, fingerprints = categories, images, fingerprints_new
+            self.changes.put(diff)
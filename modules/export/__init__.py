@@ -1,4 +1,19 @@
-from .filter_utils import FilterDialog
-from .merge_utils import MergeDialog
+from modules import lazy_exports
 
-__all__ = [FilterDialog, MergeDialog]
\ No newline at end of file
+# Export dialogs are only imported when an export starts
+_submodules = {
+    "ExportOptionsDialog": "options_utils",
+    "FilterDialog": "filter_utils",
+    "MergeDialog": "merge_utils",
+    "build_category_mapping": "export_utils",
+    "build_export_data": "export_utils",
+    "copy_images": "copy_utils",
+    "export_crops": "crop_utils",
+    "export_balanced_subset": "balance_utils",
+    "export_coco": "export_utils",
+    "export_splits": "split_utils",
+    "save_export_data": "export_utils"
+}
+
+__all__ = list(_submodules)
+__getattr__ = lazy_exports(__name__, _submodules)
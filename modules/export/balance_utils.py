@@ -0,0 +1,87 @@
+import numpy as np
+
+from modules.profiling import profiler
+
+from .export_utils import export_coco
+from .histogram_utils import build_image_class_counts, rarest_classes, select_rows
+
+def balanced_subsample(image_class_counts, num_images, caps, count_images=False, seed=0):
+    # Greedy selection from the rarest class up: the images of every class stratum are
+    # taken in a seeded random order until the class reaches its cap, counting what
+    # images picked for rarer classes already contributed. Rare classes are kept whole,
+    # common classes may overshoot by the boxes they share with rarer ones
+    rng = np.random.default_rng(seed)
+    pair_classes = image_class_counts['classes']
+    num_classes = image_class_counts['num_classes']
+    values = np.ones_like(image_class_counts['counts']) if count_images else image_class_counts['counts']
+    class_total = np.bincount(pair_classes, weights=values, minlength=num_classes)
+
+    # Every image belongs to the stratum of its rarest class, and adds its own
+    # count of that class when taken
+    strata = rarest_classes(image_class_counts, num_images, class_total)
+    stratum_value = np.zeros(num_images)
+    in_stratum = pair_classes == strata[image_class_counts['image']]
+    stratum_value[image_class_counts['image'][in_stratum]] = values[in_stratum]
+
+    order = np.lexsort((rng.random(num_images), strata))
+    stratum_start = np.searchsorted(strata[order], np.arange(num_classes + 1))
+
+    selected = np.zeros(num_images, dtype=bool)
+    have = np.zeros(num_classes)
+    for class_id in np.argsort(class_total, kind='stable').tolist():
+        need = caps[class_id] - have[class_id]
+        if need <= 0:
+            continue
+        candidates = order[stratum_start[class_id]:stratum_start[class_id + 1]]
+        reached = np.searchsorted(np.cumsum(stratum_value[candidates]), need, side='left')
+        taken = candidates[:reached + 1]
+        selected[taken] = True
+        pairs = select_rows(image_class_counts, taken)
+        have += np.bincount(pair_classes[pairs], weights=values[pairs], minlength=num_classes)
+    return selected
+
+@profiler.timed("export_balanced")
+def export_balanced_subset(images, image_annotations, category_mapping, new_categories, default_cap, filename,
+                           class_caps=None, count_images=False, seed=0, exporter=export_coco):
+    # Writes a class-balanced image subset with the exporter of the dataset format,
+    # class_caps overrides the default cap for {new category id: cap}
+    image_ids = list(images.keys())
+    image_class_counts = build_image_class_counts(image_ids, image_annotations, category_mapping, len(new_categories))
+    num_classes = image_class_counts['num_classes']
+    caps = np.full(num_classes, default_cap, dtype=np.float64)
+    for cat_id, cap in (class_caps or {}).items():
+        if cat_id < num_classes:
+            caps[cat_id] = cap
+    selected = balanced_subsample(image_class_counts, len(image_ids), caps, count_images, seed)
+
+    subset_ids = [image_id for image_id, keep in zip(image_ids, selected.tolist()) if keep]
+    exporter(
+        {image_id: images[image_id] for image_id in subset_ids},
+        {image_id: image_annotations.get(image_id, []) for image_id in subset_ids},
+        category_mapping,
+        new_categories,
+        filename
+    )
+
+    # Boxes and images per class, before and after subsampling
+    pair_images = image_class_counts['image']
+    pair_classes = image_class_counts['classes']
+    counts = image_class_counts['counts']
+    kept = selected[pair_images]
+    histogram = {
+        'boxes': np.bincount(pair_classes, weights=counts, minlength=num_classes),
+        'boxes_kept': np.bincount(pair_classes[kept], weights=counts[kept], minlength=num_classes),
+        'images': np.bincount(pair_classes, minlength=num_classes),
+        'images_kept': np.bincount(pair_classes[kept], minlength=num_classes)
+    }
+    return {
+        'file': filename,
+        'images': len(subset_ids),
+        'classes': {
+            cat_id: dict(
+                {name: int(column[cat_id]) for name, column in histogram.items()},
+                name=new_categories.get(cat_id, str(cat_id))
+            )
+            for cat_id in range(num_classes)
+        }
+    }
@@ -0,0 +1,62 @@
+import os
+import shutil
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+def copy_image(src, dst, hardlink):
+    # Returns how the file was materialized
+    if not os.path.isfile(src):
+        return 'missing'
+    if os.path.exists(dst):
+        if os.path.samefile(src, dst):
+            return 'skipped'
+        if os.path.getsize(dst) == os.path.getsize(src):
+            # Left by an earlier, interrupted run
+            return 'skipped'
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if hardlink:
+        try:
+            if os.path.exists(dst):
+                os.remove(dst)
+            os.link(src, dst)
+            return 'linked'
+        except OSError:
+            # Different filesystem or no link support, fall back to copying
+            pass
+    try:
+        shutil.copy2(src, dst)
+    except shutil.SameFileError:
+        return 'skipped'
+    return 'copied'
+
+def copy_images(file_names, image_root, output_dir, hardlink=False, workers=16, progress_callback=None):
+    # Copy or hard link images keeping their relative paths. File copies are I/O bound,
+    # so threads are enough, and only a few tasks per worker are in flight at a time
+    summary = Counter(copied=0, linked=0, skipped=0, missing=0)
+
+    # Images may share a file name, every destination is written by one worker only
+    file_names = list(dict.fromkeys(os.path.normpath(file_name) for file_name in file_names))
+    total = len(file_names)
+    done = 0
+    max_pending = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for file_name in file_names:
+            src = os.path.join(image_root, file_name)
+            dst = os.path.join(output_dir, file_name)
+            pending.add(executor.submit(copy_image, src, dst, hardlink))
+            if len(pending) < max_pending:
+                continue
+            completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                summary[future.result()] += 1
+            done += len(completed)
+            if progress_callback:
+                progress_callback(done, total)
+
+        for future in pending:
+            summary[future.result()] += 1
+
+    if progress_callback:
+        progress_callback(total, total)
+    return summary
@@ -0,0 +1,112 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from multiprocessing import get_context
+
+from PIL import Image
+
+# Manifest is written as JSON lines next to the class folders, one record per line:
+#   {"file": "<class>/<image_id>_<annotation_id>.jpg", "class": ..., "image_id": ..., "annotation_id": ..., "box": [x, y, w, h]}
+#   {"image_id": ..., "file_name": ..., "error": ...} for images that could not be read
+
+def class_folder_names(new_categories):
+    # {new category id: folder name}, names are made filesystem safe and kept unique
+    folders = {}
+    used = set()
+    for cat_id, name in new_categories.items():
+        folder = re.sub(r'[^\w.-]+', '_', name).strip('._') or str(cat_id)
+        if folder in used:
+            folder = f"{folder}_{cat_id}"
+        used.add(folder)
+        folders[cat_id] = folder
+    return folders
+
+def crop_bounds(bbox, width, height, padding):
+    # Box grown by padding times its size on every side, clipped to the image
+    x, y, w, h = bbox
+    pad_x, pad_y = w * padding, h * padding
+    left = max(0, math.floor(x - pad_x))
+    top = max(0, math.floor(y - pad_y))
+    right = min(width, math.ceil(x + w + pad_x))
+    bottom = min(height, math.ceil(y + h + pad_y))
+    return left, top, right, bottom
+
+def crop_image(task):
+    # Decode one source image and write all of its crops
+    image_id, image_path, file_name, crops, output_dir, padding = task
+    records = []
+    try:
+        with Image.open(image_path) as img:
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            for annotation_id, cat_id, folder, bbox in crops:
+                left, top, right, bottom = crop_bounds(bbox, img.width, img.height, padding)
+                if right <= left or bottom <= top:
+                    continue
+                file = os.path.join(folder, f"{image_id}_{annotation_id}.jpg")
+                img.crop((left, top, right, bottom)).save(os.path.join(output_dir, file), quality=95)
+                records.append({
+                    'file': file,
+                    'class': cat_id,
+                    'image_id': image_id,
+                    'annotation_id': annotation_id,
+                    'box': [left, top, right - left, bottom - top]
+                })
+    except Exception as e:
+        records.append({'image_id': image_id, 'file_name': file_name, 'error': str(e)})
+    return records
+
+def export_crops(images, image_annotations, category_mapping, new_categories, image_root, output_dir,
+                 padding=0.0, min_size=1, workers=None, chunksize=16, progress_callback=None):
+    # Cuts every box kept by the category mapping into <output_dir>/<class>/, boxes
+    # smaller than min_size pixels in either dimension are skipped
+    folders = class_folder_names(new_categories)
+    for folder in folders.values():
+        os.makedirs(os.path.join(output_dir, folder), exist_ok=True)
+
+    # One task per source image so every image is decoded once
+    tasks = []
+    skipped = 0
+    for image_id, info in images.items():
+        crops = []
+        for ann in image_annotations.get(image_id, ()):
+            if ann['category_id'] not in category_mapping:
+                continue
+            if ann['bbox'][2] < min_size or ann['bbox'][3] < min_size:
+                skipped += 1
+                continue
+            cat_id = category_mapping[ann['category_id']]
+            crops.append((ann['id'], cat_id, folders[cat_id], ann['bbox']))
+        if crops:
+            image_path = os.path.join(image_root, info['file_name'])
+            tasks.append((image_id, image_path, info['file_name'], crops, output_dir, padding))
+
+    summary = {
+        'crops': Counter(),
+        'skipped_boxes': skipped,
+        'failed_images': 0,
+        'manifest': os.path.join(output_dir, "manifest.jsonl")
+    }
+    total = len(tasks)
+    done = 0
+    with open(summary['manifest'], 'w') as f:
+        # Workers write the crops and only return manifest records, so memory stays bounded
+        # by one decoded image per worker. Spawned workers do not inherit the GUI process state
+        with get_context('spawn').Pool(workers) as pool:
+            for records in pool.imap_unordered(crop_image, tasks, chunksize=chunksize):
+                for record in records:
+                    if 'error' in record:
+                        summary['failed_images'] += 1
+                    else:
+                        record['class'] = new_categories[record['class']]
+                        summary['crops'][record['class']] += 1
+                    f.write(json.dumps(record) + '\n')
+                done += 1
+                if progress_callback and done % chunksize == 0:
+                    progress_callback(done, total)
+
+    if progress_callback:
+        progress_callback(total, total)
+    return summary
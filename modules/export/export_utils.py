@@ -0,0 +1,97 @@
+import json
+
+from modules.profiling import profiler
+
+def build_category_mapping(categories, filtered_categories, merge_groups):
+    # Create category mapping for merged categories
+    category_mapping = {}
+    old_categories = set(filtered_categories)
+    new_categories = {}
+    next_category_id = 0
+
+    # Add merged categories
+    for group in merge_groups:
+        for old_cat_id in group['categories']:
+            category_mapping[old_cat_id] = next_category_id
+            # Remove old category if it's being merged
+            old_categories.remove(old_cat_id)
+        new_categories[next_category_id] = group['new_name']
+        next_category_id += 1
+
+    # Filtered categories that are not merged
+    for old_cat_id in old_categories:
+        category_mapping[old_cat_id] = next_category_id # continue with new category id
+        new_categories[next_category_id] = categories[old_cat_id]['name']
+        next_category_id += 1
+
+    return category_mapping, new_categories
+
+@profiler.timed("export_build")
+def build_export_data(images, image_annotations, category_mapping, new_categories, renumber_ids=False,
+                      drop_empty_images=False):
+    # Create COCO format data with merged and filtered categories
+    annotations = [
+        {
+            'id': ann['id'],
+            'image_id': img_id,
+            'category_id': category_mapping[ann['category_id']],
+            'bbox': ann['bbox'],
+            'score': ann['score']
+        }
+        for img_id, anns in image_annotations.items()
+        for ann in anns
+        if ann['category_id'] in category_mapping
+    ]
+
+    # Images left without annotations after filtering can be dropped
+    image_ids = images.keys()
+    if drop_empty_images:
+        annotated_images = {ann['image_id'] for ann in annotations}
+        image_ids = [img_id for img_id in images if img_id in annotated_images]
+
+    export_images = [
+        {
+            'id': img_id,
+            'file_name': images[img_id]['file_name'],
+            'width': images[img_id]['width'],
+            'height': images[img_id]['height']
+        }
+        for img_id in image_ids
+    ]
+
+    if renumber_ids:
+        # Contiguous ids from 1 in export order, annotations of images that are not exported are dropped
+        new_image_ids = {img['id']: i for i, img in enumerate(export_images, 1)}
+        for img in export_images:
+            img['id'] = new_image_ids[img['id']]
+        annotations = [ann for ann in annotations if ann['image_id'] in new_image_ids]
+        for i, ann in enumerate(annotations, 1):
+            ann['id'] = i
+            ann['image_id'] = new_image_ids[ann['image_id']]
+
+    return {
+        'images': export_images,
+        'categories': [
+            {
+                'id': cat_id,
+                'name': cat_name
+            }
+            for cat_id, cat_name in new_categories.items()
+        ],
+        'annotations': annotations
+    }
+
+@profiler.timed("export_serialize")
+def save_export_data(export_data, filename):
+    # Save to file
+    with open(filename, 'w') as f:
+        json.dump(export_data, f, indent=2)
+
+def export_coco(images, image_annotations, category_mapping, new_categories, filename, renumber_ids=False,
+                drop_empty_images=False):
+    # Exporter of the COCO format in the format registry, returns the file names of the exported images
+    export_data = build_export_data(
+        images, image_annotations, category_mapping, new_categories, renumber_ids, drop_empty_images
+    )
+    save_export_data(export_data, filename)
+    return [img['file_name'] for img in export_data['images']]
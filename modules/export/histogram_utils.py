@@ -0,0 +1,55 @@
+import numpy as np
+
+def build_image_class_counts(image_ids, image_annotations, category_mapping, num_classes=0):
+    # Sparse image x class count matrix after filtering and merging, as CSR arrays:
+    # the classes and counts of image i are classes[indptr[i]:indptr[i + 1]].
+    # num_classes keeps trailing classes without boxes in the class range
+    lengths = np.fromiter(
+        (len(image_annotations.get(image_id, ())) for image_id in image_ids),
+        dtype=np.int64,
+        count=len(image_ids)
+    )
+    image_index = np.repeat(np.arange(len(image_ids)), lengths)
+    classes = np.fromiter(
+        (
+            category_mapping.get(ann['category_id'], -1)
+            for image_id in image_ids
+            for ann in image_annotations.get(image_id, ())
+        ),
+        dtype=np.int64,
+        count=int(lengths.sum())
+    )
+
+    # Drop filtered annotations and count unique (image, class) pairs
+    kept = classes >= 0
+    num_classes = max(num_classes, int(classes.max(initial=-1)) + 1)
+    pairs, counts = np.unique(image_index[kept] * max(num_classes, 1) + classes[kept], return_counts=True)
+    pair_images, pair_classes = np.divmod(pairs, max(num_classes, 1))
+
+    indptr = np.zeros(len(image_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pair_images, minlength=len(image_ids)), out=indptr[1:])
+    return {
+        'indptr': indptr,
+        'image': pair_images,
+        'classes': pair_classes,
+        'counts': counts,
+        'num_classes': num_classes
+    }
+
+def rarest_classes(image_class_counts, num_images, class_frequency):
+    # Least frequent class of every image, images without boxes get num_classes
+    pair_images = image_class_counts['image']
+    pair_classes = image_class_counts['classes']
+    rarest = np.full(num_images, image_class_counts['num_classes'], dtype=np.int64)
+    order = np.lexsort((class_frequency[pair_classes], pair_images))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = pair_images[order][1:] != pair_images[order][:-1]
+    rarest[pair_images[order][first]] = pair_classes[order][first]
+    return rarest
+
+def select_rows(image_class_counts, rows):
+    # Indices into the CSR pair arrays of the given images
+    indptr = image_class_counts['indptr']
+    lengths = indptr[rows + 1] - indptr[rows]
+    offsets = np.repeat(indptr[rows] - (np.cumsum(lengths) - lengths), lengths)
+    return offsets + np.arange(int(lengths.sum()))
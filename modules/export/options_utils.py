@@ -0,0 +1,65 @@
+import tkinter as tk
+import customtkinter as ctk
+
+class ExportOptionsDialog(ctk.CTkToplevel):
+    def __init__(self, parent, callback):
+        super().__init__(parent)
+
+        self.title("Step 3: Export Options")
+        self.geometry("400x300")
+        self.attributes('-topmost', True)
+
+        self.callback = callback
+        self.image_modes = {"Do not copy": None, "Copy": "copy", "Hard link": "hardlink"}
+
+        self.create_ui()
+
+    def create_ui(self):
+        main_frame = ctk.CTkFrame(self)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Id and image options
+        self.renumber_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            main_frame,
+            text="Renumber image and annotation ids from 1",
+            variable=self.renumber_var
+        ).pack(pady=5, anchor="w")
+
+        self.drop_empty_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            main_frame,
+            text="Drop images without annotations",
+            variable=self.drop_empty_var
+        ).pack(pady=5, anchor="w")
+
+        # Exported images are written to an images folder next to the annotation file
+        ctk.CTkLabel(
+            main_frame,
+            text="Images next to the exported file:",
+            wraplength=350
+        ).pack(pady=(10, 0), anchor="w")
+        self.image_mode_var = tk.StringVar(value="Do not copy")
+        ctk.CTkOptionMenu(
+            main_frame,
+            values=list(self.image_modes),
+            variable=self.image_mode_var
+        ).pack(pady=5, anchor="w")
+
+        # Bottom buttons frame
+        button_frame = ctk.CTkFrame(self)
+        button_frame.pack(fill="x", padx=10, pady=10)
+
+        ctk.CTkButton(
+            button_frame,
+            text="Export",
+            command=self.finish
+        ).pack(pady=5)
+
+    def finish(self):
+        self.callback({
+            'renumber_ids': self.renumber_var.get(),
+            'drop_empty_images': self.drop_empty_var.get(),
+            'copy_images': self.image_modes[self.image_mode_var.get()]
+        })
+        self.destroy()
@@ -0,0 +1,81 @@
+import numpy as np
+
+from modules.profiling import profiler
+
+from .export_utils import export_coco
+from .histogram_utils import build_image_class_counts, rarest_classes
+
+def assign_splits(image_class_counts, num_images, ratios, seed=0):
+    # Multi-label stratification: every image is stratified by its rarest class, then
+    # each stratum is shuffled and cut by the ratios with a random start, so even
+    # strata of a single image are split in the right proportion on average
+    rng = np.random.default_rng(seed)
+    pair_classes = image_class_counts['classes']
+    num_classes = image_class_counts['num_classes']
+
+    # Images containing each class, the rarest class of an image is its stratum
+    class_frequency = np.bincount(pair_classes, minlength=num_classes)
+    strata = rarest_classes(image_class_counts, num_images, class_frequency)
+
+    # Shuffle within strata and get the rank of every image in its stratum
+    order = np.lexsort((rng.random(num_images), strata))
+    sorted_strata = strata[order]
+    stratum_start = np.searchsorted(sorted_strata, sorted_strata, side='left')
+    stratum_size = np.searchsorted(sorted_strata, sorted_strata, side='right') - stratum_start
+    rank = np.arange(num_images) - stratum_start
+
+    # Systematic sampling with one random start per stratum
+    offset = rng.random(num_classes + 1)[sorted_strata]
+    position = ((rank + offset) / stratum_size) % 1.0
+    bounds = np.cumsum(np.asarray(ratios, dtype=np.float64) / np.sum(ratios))[:-1]
+
+    splits = np.empty(num_images, dtype=np.int64)
+    splits[order] = np.searchsorted(bounds, position, side='right')
+    return splits
+
+def split_class_distribution(image_class_counts, splits, num_splits):
+    # Box counts per (split, class) and image counts per split
+    num_classes = image_class_counts['num_classes']
+    boxes = np.bincount(
+        splits[image_class_counts['image']] * num_classes + image_class_counts['classes'],
+        weights=image_class_counts['counts'],
+        minlength=num_splits * num_classes
+    ).reshape(num_splits, num_classes).astype(np.int64)
+    images = np.bincount(splits, minlength=num_splits)
+    return boxes, images
+
+@profiler.timed("export_splits")
+def export_splits(images, image_annotations, category_mapping, new_categories, ratios, split_names,
+                  filename_template, seed=0, exporter=export_coco):
+    # Writes one annotation file per split with the exporter of the dataset format,
+    # filename_template is formatted with the split name
+    image_ids = list(images.keys())
+    image_class_counts = build_image_class_counts(image_ids, image_annotations, category_mapping, len(new_categories))
+    splits = assign_splits(image_class_counts, len(image_ids), ratios, seed)
+
+    # Single pass over images sorting them into splits
+    split_images = [{} for _ in split_names]
+    split_annotations = [{} for _ in split_names]
+    for image_id, split in zip(image_ids, splits.tolist()):
+        split_images[split][image_id] = images[image_id]
+        split_annotations[split][image_id] = image_annotations.get(image_id, [])
+
+    paths = []
+    for name, subset_images, subset_annotations in zip(split_names, split_images, split_annotations):
+        path = filename_template.format(split=name)
+        exporter(subset_images, subset_annotations, category_mapping, new_categories, path)
+        paths.append(path)
+
+    # Class distribution of every split for the report, keyed by id as merged groups may share a name
+    boxes, image_counts = split_class_distribution(image_class_counts, splits, len(split_names))
+    return {
+        'files': dict(zip(split_names, paths)),
+        'images': dict(zip(split_names, image_counts.tolist())),
+        'classes': {
+            cat_id: {
+                'name': new_categories.get(cat_id, str(cat_id)),
+                'boxes': dict(zip(split_names, class_boxes))
+            }
+            for cat_id, class_boxes in enumerate(boxes.T.tolist())
+        }
+    }
@@ -0,0 +1,3 @@
+from .format_utils import format_names, get_exporter, get_loader, get_prediction_loader, register_format
+
+__all__ = ["format_names", "get_exporter", "get_loader", "get_prediction_loader", "register_format"]
@@ -0,0 +1,54 @@
+import importlib
+
+# Loader, prediction loader and exporter of every dataset format as "module:function" paths,
+# modules are only imported the first time a format is used. Every export that writes
+# annotation files (full, split and balanced) goes through the exporter, crop export
+# writes images only and does not depend on the format
+FORMATS = {}
+_resolved = {}
+
+def register_format(name, loader, prediction_loader=None, exporter=None):
+    FORMATS[name] = {
+        'loader': loader,
+        'prediction_loader': prediction_loader,
+        'exporter': exporter
+    }
+
+def format_names():
+    # Dataset formats in registration order
+    return list(FORMATS)
+
+def resolve(path):
+    # Import "module:function" once and cache the function
+    if path not in _resolved:
+        module_name, function_name = path.split(":")
+        _resolved[path] = getattr(importlib.import_module(module_name), function_name)
+    return _resolved[path]
+
+def get_format_function(name, role):
+    if name not in FORMATS:
+        raise ValueError(f"Unknown dataset format: {name}")
+    path = FORMATS[name][role]
+    if path is None:
+        raise ValueError(f"{name} format has no {role.replace('_', ' ')}")
+    return resolve(path)
+
+def get_loader(name):
+    # loader(path) -> (categories, images, image_annotations)
+    return get_format_function(name, 'loader')
+
+def get_prediction_loader(name):
+    # prediction_loader(path) -> image_annotations
+    return get_format_function(name, 'prediction_loader')
+
+def get_exporter(name):
+    # exporter(images, image_annotations, category_mapping, new_categories, filename, **options)
+    # -> file names of the exported images
+    return get_format_function(name, 'exporter')
+
+register_format(
+    "COCO",
+    loader="modules.dataset.coco_utils:load_coco",
+    prediction_loader="modules.dataset.coco_utils:load_coco_predictions",
+    exporter="modules.export.export_utils:export_coco"
+)
@@ -0,0 +1,9 @@
+from modules import lazy_exports
+
+# The grid dialog is imported when it is first opened
+_submodules = {
+    "ThumbnailGridDialog": "grid_utils"
+}
+
+__all__ = list(_submodules)
+__getattr__ = lazy_exports(__name__, _submodules)
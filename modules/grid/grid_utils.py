@@ -0,0 +1,217 @@
+import os
+import tkinter as tk
+
+import customtkinter as ctk
+from PIL import Image, ImageTk
+
+from .thumbnail_utils import ThumbnailLoader
+
+class ThumbnailGridDialog(ctk.CTkToplevel):
+    def __init__(self, parent, images, image_ids, image_root, get_annotations, get_color, on_select,
+                 thumbnail_size=160):
+        super().__init__(parent)
+
+        self.title("Thumbnail Grid")
+        self.geometry("1200x800")
+
+        self.images = images
+        self.image_ids = image_ids
+        self.image_root = image_root
+        self.get_annotations = get_annotations
+        self.get_color = get_color
+        self.on_select = on_select
+
+        # Cell layout
+        self.thumbnail_size = thumbnail_size
+        self.padding = 8
+        self.label_height = 16
+        self.cell_width = thumbnail_size + self.padding
+        self.cell_height = thumbnail_size + self.label_height + self.padding
+        self.columns = 1
+
+        # Only cells in view exist on the canvas, keyed by position in image_ids
+        self.cells = {}  # {index: {'items': [...], 'photo': PhotoImage or None}}
+        self.path_cells = {}  # {image_path: {index}} of cells waiting for a thumbnail
+        self.loader = ThumbnailLoader(size=thumbnail_size)
+
+        self.create_ui()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.poll_id = None
+        self.poll_thumbnails()
+
+    def create_ui(self):
+        self.canvas = tk.Canvas(self, bg='gray20', highlightthickness=0)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+
+        # Bind events
+        self.canvas.bind('<Configure>', self.on_resize)
+        self.canvas.bind('<MouseWheel>', self.on_mousewheel)
+        self.canvas.bind('<Button-4>', lambda event: self.scroll(-1, "units"))
+        self.canvas.bind('<Button-5>', lambda event: self.scroll(1, "units"))
+        self.canvas.bind('<ButtonRelease-1>', self.on_click)
+        self.bind('<Prior>', lambda event: self.scroll(-1, "pages"))
+        self.bind('<Next>', lambda event: self.scroll(1, "pages"))
+
+    # Layout functions
+    def on_resize(self, event):
+        columns = max(1, event.width // self.cell_width)
+        if columns != self.columns:
+            # Cell positions depend on the column count, rebuild visible cells
+            self.columns = columns
+            self.clear_cells()
+        self.update_scrollregion()
+        self.update_visible_cells()
+
+    def update_scrollregion(self):
+        rows = -(-len(self.image_ids) // self.columns)
+        self.canvas.configure(
+            scrollregion=(0, 0, self.columns * self.cell_width, rows * self.cell_height),
+            yscrollincrement=self.cell_height // 4
+        )
+
+    def visible_range(self):
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first_row = max(0, int(top // self.cell_height))
+        last_row = int(bottom // self.cell_height) + 1
+        return first_row * self.columns, min(len(self.image_ids), last_row * self.columns)
+
+    def update_visible_cells(self):
+        start, end = self.visible_range()
+
+        # Drop cells that scrolled out of view
+        for index in [index for index in self.cells if not start <= index < end]:
+            self.delete_cell(index)
+
+        for index in range(start, end):
+            if index not in self.cells:
+                self.create_cell(index)
+
+        # Prefetch the next page into the disk cache
+        for index in range(end, min(len(self.image_ids), 2 * end - start)):
+            self.loader.request(self.get_image_path(index))
+
+    def clear_cells(self):
+        for index in list(self.cells):
+            self.delete_cell(index)
+
+    def set_image_ids(self, images, image_ids):
+        # Rebuild the grid after the dataset changed, cells hold positions in the old image list
+        self.clear_cells()
+        self.images = images
+        self.image_ids = image_ids
+        self.update_scrollregion()
+        self.update_visible_cells()
+
+    # Cell functions
+    def cell_origin(self, index):
+        row, column = divmod(index, self.columns)
+        return column * self.cell_width + self.padding // 2, row * self.cell_height + self.padding // 2
+
+    def get_image_path(self, index):
+        return os.path.join(self.image_root, self.images[self.image_ids[index]]['file_name'])
+
+    def create_cell(self, index):
+        x0, y0 = self.cell_origin(index)
+        image_info = self.images[self.image_ids[index]]
+        image_path = self.get_image_path(index)
+
+        # Placeholder until the thumbnail is ready
+        items = [
+            self.canvas.create_rectangle(
+                x0, y0, x0 + self.thumbnail_size, y0 + self.thumbnail_size,
+                fill="gray15",
+                outline=""
+            ),
+            self.canvas.create_text(
+                x0, y0 + self.thumbnail_size + 2,
+                text=image_info['file_name'][-24:],
+                fill="white",
+                anchor="nw",
+                font=("", 9)
+            )
+        ]
+        self.cells[index] = {'items': items, 'photo': None, 'path': image_path}
+        self.path_cells.setdefault(image_path, set()).add(index)
+        self.loader.request(image_path)
+
+    def delete_cell(self, index):
+        cell = self.cells.pop(index)
+        self.canvas.delete(*cell['items'])
+        image_path = cell['path']
+        waiting = self.path_cells.get(image_path)
+        if waiting is not None:
+            waiting.discard(index)
+            if not waiting:
+                # Nobody waits for this thumbnail anymore
+                del self.path_cells[image_path]
+                self.loader.cancel(image_path)
+
+    def show_thumbnail(self, index, cache_path):
+        cell = self.cells[index]
+        x0, y0 = self.cell_origin(index)
+        image_id = self.image_ids[index]
+        image_info = self.images[image_id]
+
+        with Image.open(cache_path) as img:
+            cell['photo'] = ImageTk.PhotoImage(img)
+        thumb_width, thumb_height = cell['photo'].width(), cell['photo'].height()
+
+        # Center thumbnail in the cell
+        x0 += (self.thumbnail_size - thumb_width) // 2
+        y0 += (self.thumbnail_size - thumb_height) // 2
+        cell['items'].append(self.canvas.create_image(x0, y0, image=cell['photo'], anchor="nw"))
+
+        # Draw boxes scaled to the thumbnail
+        scale_x = thumb_width / image_info['width']
+        scale_y = thumb_height / image_info['height']
+        for ann in self.get_annotations(image_id):
+            x, y, w, h = ann['bbox']
+            cell['items'].append(self.canvas.create_rectangle(
+                x0 + x * scale_x, y0 + y * scale_y,
+                x0 + (x + w) * scale_x, y0 + (y + h) * scale_y,
+                outline=self.get_color(ann['category_id'])
+            ))
+
+    def poll_thumbnails(self):
+        # Reschedule first so a failing cell never stops thumbnail loading
+        self.poll_id = self.after(30, self.poll_thumbnails)
+        for image_path, cache_path, error in self.loader.poll():
+            for index in self.path_cells.pop(image_path, ()):
+                if error is None:
+                    try:
+                        self.show_thumbnail(index, cache_path)
+                        continue
+                    except (OSError, ValueError, ZeroDivisionError):
+                        # Cache file removed after the loader checked it, or an image without size
+                        pass
+                # Mark unreadable images
+                self.canvas.itemconfigure(self.cells[index]['items'][0], fill="darkred")
+
+    # Event functions
+    def on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self.update_visible_cells()
+
+    def scroll(self, amount, what):
+        self.canvas.yview_scroll(amount, what)
+        self.update_visible_cells()
+
+    def on_mousewheel(self, event):
+        self.scroll(-1 if event.delta > 0 else 1, "units")
+
+    def on_click(self, event):
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        column, row = int(x // self.cell_width), int(y // self.cell_height)
+        index = row * self.columns + column
+        if column < self.columns and index < len(self.image_ids):
+            self.on_select(index)
+
+    def close(self):
+        if self.poll_id is not None:
+            self.after_cancel(self.poll_id)
+        self.loader.close()
+        self.destroy()
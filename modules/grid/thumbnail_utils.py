@@ -0,0 +1,88 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from PIL import Image
+
+def default_cache_dir():
+    # ODV_THUMBNAIL_CACHE overrides the per-user cache directory
+    return os.environ.get(
+        "ODV_THUMBNAIL_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "object-detection-dataset-visualizer", "thumbnails")
+    )
+
+def thumbnail_cache_path(cache_dir, image_path, size):
+    # Content address from path, mtime and file size, so edited files get new thumbnails
+    stat = os.stat(image_path)
+    key = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{size}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, digest[:2], f"{digest}.jpg")
+
+def make_thumbnail(task):
+    # Returns the cached thumbnail file of an image, generating it if needed
+    image_path, cache_dir, size = task
+    cache_path = thumbnail_cache_path(cache_dir, image_path, size)
+    if os.path.exists(cache_path):
+        return image_path, cache_path
+
+    with Image.open(image_path) as img:
+        # Let JPEG decode at a reduced scale, much faster than a full decode
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+        img.thumbnail((size, size), Image.BILINEAR)
+
+        # Write to a temporary file first so readers never see partial thumbnails
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        img.save(tmp_path, "JPEG", quality=85)
+        os.replace(tmp_path, cache_path)
+    return image_path, cache_path
+
+class ThumbnailLoader:
+    # Generates thumbnails in a process pool, results are collected by polling
+    def __init__(self, cache_dir=None, size=160, workers=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.size = size
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        self.pending = {}  # {image_path: future}
+        self.ready = []  # [(image_path, cache_path, None)] found in the cache without a worker
+
+    def request(self, image_path):
+        if image_path in self.pending:
+            return
+        # Cached thumbnails skip the process pool round trip
+        try:
+            cache_path = thumbnail_cache_path(self.cache_dir, image_path, self.size)
+        except OSError as e:
+            self.ready.append((image_path, None, e))
+            return
+        if os.path.exists(cache_path):
+            self.ready.append((image_path, cache_path, None))
+        else:
+            self.pending[image_path] = self.executor.submit(make_thumbnail, (image_path, self.cache_dir, self.size))
+
+    def cancel(self, image_path):
+        future = self.pending.pop(image_path, None)
+        if future is not None:
+            future.cancel()
+
+    def poll(self):
+        # [(image_path, cache_path or None, error or None)] of finished requests
+        finished, self.ready = self.ready, []
+        for image_path, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[image_path]
+                if future.cancelled():
+                    continue
+                try:
+                    finished.append(future.result() + (None,))
+                except Exception as e:
+                    finished.append((image_path, None, e))
+        return finished
+
+    def close(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        self.executor.shutdown(wait=False)
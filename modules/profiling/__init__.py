@@ -0,0 +1,8 @@
+import os
+
+from .profiler_utils import Histogram, Profiler
+
+# Session-wide profiler, ODV_TRACE=<path> writes a trace file of all sections on exit
+profiler = Profiler(trace_path=os.environ.get("ODV_TRACE"))
+
+__all__ = ["Histogram", "Profiler", "profiler"]
@@ -0,0 +1,132 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+class Histogram:
+    # Log2-bucketed durations in microseconds, recording is a few integer operations
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets = [0] * 40
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.min = min(self.min, duration)
+        self.max = max(self.max, duration)
+        self.buckets[min(int(duration * 1e6).bit_length(), 39)] += 1
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th percentile, in seconds
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= target:
+                return min((1 << i) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'min_ms': self.min * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(0.5) * 1000,
+            'p95_ms': self.percentile(0.95) * 1000,
+            'max_ms': self.max * 1000
+        }
+
+class Section:
+    # Context manager timing one section, cheaper than a generator based contextmanager
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+class Profiler:
+    def __init__(self, trace_path=None, max_trace_events=1_000_000):
+        self.histograms = {}  # {section name: Histogram}
+        self.last = {}  # {section name: last duration in seconds}
+        self.trace_path = trace_path
+        # Only the most recent events are kept, long sessions would grow without bound
+        self.trace_events = deque(maxlen=max_trace_events)
+        self.dropped_trace_events = 0
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()  # sections may be recorded from background tasks
+        if trace_path:
+            atexit.register(self.dump_trace)
+
+    def section(self, name):
+        return Section(self, name)
+
+    def timed(self, name):
+        # Decorator timing every call of a function as a section
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.section(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, start, duration):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(duration)
+            self.last[name] = duration
+            if self.trace_path:
+                if len(self.trace_events) == self.trace_events.maxlen:
+                    self.dropped_trace_events += 1
+                self.trace_events.append((name, start, duration, threading.get_ident()))
+
+    def summary(self):
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def snapshot(self):
+        # Consistent copy of the last durations and the summary for readers on other threads
+        with self.lock:
+            return dict(self.last), {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def dump_trace(self, trace_path=None):
+        # Chrome trace event format, opens in chrome://tracing and Perfetto
+        trace_path = trace_path or self.trace_path
+        if not trace_path:
+            return
+        with self.lock:
+            events = [
+                {
+                    'name': name,
+                    'ph': 'X',
+                    'ts': (start - self.origin) * 1e6,
+                    'dur': duration * 1e6,
+                    'pid': os.getpid(),
+                    'tid': tid
+                }
+                for name, start, duration, tid in self.trace_events
+            ]
+            dropped = self.dropped_trace_events
+        with open(trace_path, 'w') as f:
+            json.dump({
+                'traceEvents': events,
+                'otherData': {'histograms': self.summary(), 'dropped_events': dropped}
+            }, f)
@@ -0,0 +1,12 @@
+from modules import lazy_exports
+
+# Analyses are imported the first time they run
+_submodules = {
+    "evaluate_predictions": "matching_utils",
+    "find_duplicates": "duplicate_utils",
+    "find_set_disagreements": "set_compare_utils",
+    "scan_dataset": "integrity_utils"
+}
+
+__all__ = list(_submodules)
+__getattr__ = lazy_exports(__name__, _submodules)
@@ -0,0 +1,47 @@
+from itertools import chain
+
+import numpy as np
+
+def boxes_to_array(anns):
+    # COCO [x, y, width, height] boxes of annotations as an (N, 4) float array,
+    # fromiter avoids building a nested list for large annotation sets
+    values = np.fromiter(chain.from_iterable(ann['bbox'] for ann in anns), dtype=np.float64)
+    if len(values) != 4 * len(anns):
+        raise ValueError("Every bbox must have 4 values [x, y, width, height]")
+    return values.reshape(-1, 4)
+
+def pairwise_iou(boxes_a, boxes_b):
+    # IoU matrix (len(a), len(b)) of COCO [x, y, width, height] boxes
+    ax1, ay1, aw, ah = (boxes_a[:, i, None] for i in range(4))
+    bx1, by1, bw, bh = (boxes_b[None, :, i] for i in range(4))
+
+    inter_w = np.clip(np.minimum(ax1 + aw, bx1 + bw) - np.maximum(ax1, bx1), 0, None)
+    inter_h = np.clip(np.minimum(ay1 + ah, by1 + bh) - np.maximum(ay1, by1), 0, None)
+    inter = inter_w * inter_h
+    union = aw * ah + bw * bh - inter
+
+    # Degenerate boxes have zero union and no overlap
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+def pair_iou(boxes_a, boxes_b):
+    # Element-wise IoU of two aligned (N, 4) arrays of COCO boxes
+    ax1, ay1, aw, ah = boxes_a.T
+    bx1, by1, bw, bh = boxes_b.T
+
+    inter_w = np.clip(np.minimum(ax1 + aw, bx1 + bw) - np.maximum(ax1, bx1), 0, None)
+    inter_h = np.clip(np.minimum(ay1 + ah, by1 + bh) - np.maximum(ay1, by1), 0, None)
+    inter = inter_w * inter_h
+    union = aw * ah + bw * bh - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+def flatten_annotations(image_annotations, image_ids):
+    # Annotations of the given images as flat arrays, image index is the position in image_ids
+    anns = [ann for image_id in image_ids for ann in image_annotations.get(image_id, [])]
+    lengths = [len(image_annotations.get(image_id, [])) for image_id in image_ids]
+    return {
+        'image': np.repeat(np.arange(len(image_ids)), lengths),
+        'category': np.array([ann['category_id'] for ann in anns], dtype=np.int64),
+        'boxes': boxes_to_array(anns),
+        'score': np.array([ann['score'] for ann in anns], dtype=np.float64),
+        'id': [ann['id'] for ann in anns]
+    }
@@ -0,0 +1,63 @@
+import numpy as np
+
+from .box_utils import boxes_to_array, pairwise_iou
+
+def find_duplicate_pairs(boxes, iou_threshold, block_size=1024):
+    # Index pairs (i < j) of boxes overlapping above the threshold. Each row block is
+    # only compared with the boxes after it, so the upper triangle is computed once
+    # and images with thousands of boxes stay within bounded memory
+    pairs = [np.empty((0, 2), dtype=np.int64)]
+    for start in range(0, len(boxes), block_size):
+        iou = pairwise_iou(boxes[start:start + block_size], boxes[start:])
+        i, j = np.nonzero(np.triu(iou >= iou_threshold, k=1))
+        pairs.append(np.stack([i + start, j + start], axis=1))
+    return np.concatenate(pairs)
+
+def find_image_duplicate_pairs(boxes, classes, iou_threshold, class_agnostic=False):
+    if class_agnostic:
+        return find_duplicate_pairs(boxes, iou_threshold)
+
+    # Only boxes of the same class are compared, one class group at a time
+    order = np.argsort(classes, kind='stable')
+    splits = np.flatnonzero(np.diff(classes[order])) + 1
+    pairs = [np.empty((0, 2), dtype=np.int64)]
+    for group in np.split(order, splits):
+        if len(group) > 1:
+            pairs.append(group[find_duplicate_pairs(boxes[group], iou_threshold)])
+    return np.concatenate(pairs)
+
+def group_pairs(pairs):
+    # Connected components of the duplicate pairs with union-find
+    parent = {}
+
+    def find(i):
+        while parent.setdefault(i, i) != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs.tolist():
+        parent[find(i)] = find(j)
+
+    clusters = {}
+    for i in parent:
+        clusters.setdefault(find(i), []).append(i)
+    return [sorted(cluster) for cluster in clusters.values()]
+
+def find_duplicates(image_annotations, iou_threshold=0.9, class_agnostic=False, progress_callback=None):
+    # {image_id: [[annotation_id, ...], ...]} of duplicate clusters per image
+    duplicates = {}
+    total = len(image_annotations)
+    for done, (image_id, anns) in enumerate(image_annotations.items(), 1):
+        if len(anns) > 1:
+            boxes = boxes_to_array(anns)
+            classes = np.array([ann['category_id'] for ann in anns])
+            pairs = find_image_duplicate_pairs(boxes, classes, iou_threshold, class_agnostic)
+            if len(pairs):
+                duplicates[image_id] = [
+                    [anns[i]['id'] for i in cluster]
+                    for cluster in group_pairs(pairs)
+                ]
+        if progress_callback and done % 1000 == 0:
+            progress_callback(done, total)
+    return duplicates
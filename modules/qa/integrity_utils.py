@@ -0,0 +1,155 @@
+import json
+import os
+from collections import Counter
+from multiprocessing import get_context
+
+import numpy as np
+from PIL import Image
+
+# Report is written as JSON lines, one record per line:
+#   {"type": "box", "image_id": ..., "annotation_id": ..., "issues": [...]}
+#   {"type": "boxes_checked", "count": ...}
+#   {"type": "image", "image_id": ..., "file_name": ..., "issues": [...], "size": [w, h]}
+# Image records are appended as they complete, so an interrupted scan can be
+# resumed by running it again with the same report path.
+
+def probe_image(task):
+    image_id, image_root, file_name, width, height, verify_decode = task
+    record = {'type': 'image', 'image_id': image_id, 'file_name': file_name, 'issues': []}
+    path = os.path.join(image_root, file_name)
+
+    if not os.path.isfile(path):
+        record['issues'].append('missing')
+        return record
+
+    try:
+        # Opening only parses the header, pixels are decoded on load
+        with Image.open(path) as img:
+            record['size'] = list(img.size)
+            if verify_decode:
+                img.load()
+    except Exception as e:
+        record['issues'].append('unreadable' if 'size' not in record else 'decode_error')
+        record['error'] = str(e)
+        return record
+
+    if record['size'] != [width, height]:
+        record['issues'].append('size_mismatch')
+    return record
+
+def check_boxes(images, image_annotations, tolerance=1.0):
+    # Flatten annotations into arrays, grouped by image
+    image_ids = [image_id for image_id, anns in image_annotations.items() if anns]
+    lengths = np.array([len(image_annotations[image_id]) for image_id in image_ids], dtype=np.int64)
+    if not image_ids:
+        return []
+
+    ann_ids = [ann['id'] for image_id in image_ids for ann in image_annotations[image_id]]
+    boxes = np.array(
+        [ann['bbox'] for image_id in image_ids for ann in image_annotations[image_id]],
+        dtype=np.float64
+    ).reshape(-1, 4)
+
+    # Image size of every annotation, NaN for annotations of unknown images
+    sizes = np.array(
+        [
+            (images[image_id]['width'], images[image_id]['height']) if image_id in images else (np.nan, np.nan)
+            for image_id in image_ids
+        ],
+        dtype=np.float64
+    ).reshape(-1, 2)
+    sizes = np.repeat(sizes, lengths, axis=0)
+    ann_image_index = np.repeat(np.arange(len(image_ids)), lengths)
+
+    x, y, w, h = boxes.T
+    img_w, img_h = sizes.T
+    flags = {
+        'unknown_image': np.isnan(img_w),
+        'non_positive_size': (w <= 0) | (h <= 0),
+        'out_of_bounds': (
+            (x < -tolerance) | (y < -tolerance) |
+            (x + w > img_w + tolerance) | (y + h > img_h + tolerance)
+        )
+    }
+
+    # Collect flagged annotations only
+    records = []
+    flagged = np.flatnonzero(np.logical_or.reduce(list(flags.values())))
+    for i in flagged:
+        records.append({
+            'type': 'box',
+            'image_id': image_ids[ann_image_index[i]],
+            'annotation_id': ann_ids[i],
+            'bbox': boxes[i].tolist(),
+            'issues': [name for name, mask in flags.items() if mask[i]]
+        })
+    return records
+
+def read_report(report_path):
+    # Records of a previous, possibly interrupted, scan and the byte size of its valid part
+    records = []
+    valid_size = 0
+    if not os.path.exists(report_path):
+        return records, valid_size
+    with open(report_path, 'rb') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Last line may be truncated if the scan was killed mid-write
+                break
+            valid_size += len(line)
+    return records, valid_size
+
+def scan_dataset(images, image_annotations, image_root, report_path, verify_decode=False,
+                 workers=None, chunksize=64, progress_callback=None):
+    previous, valid_size = read_report(report_path)
+    checked_images = {r['image_id'] for r in previous if r['type'] == 'image'}
+    boxes_checked = any(r['type'] == 'boxes_checked' for r in previous)
+    if not boxes_checked:
+        # Box records are written first, an incomplete box pass is redone from scratch
+        previous, valid_size = [], 0
+
+    summary = {'images_checked': 0, 'image_issues': Counter(), 'box_issues': Counter()}
+    for record in previous:
+        if record['type'] == 'image':
+            summary['images_checked'] += 1
+            summary['image_issues'].update(record['issues'])
+        elif record['type'] == 'box':
+            summary['box_issues'].update(record['issues'])
+
+    with open(report_path, 'a') as f:
+        # Drop a truncated last line before appending
+        f.truncate(valid_size)
+
+        if not boxes_checked:
+            box_records = check_boxes(images, image_annotations)
+            for record in box_records:
+                f.write(json.dumps(record) + '\n')
+                summary['box_issues'].update(record['issues'])
+            f.write(json.dumps({'type': 'boxes_checked', 'count': len(box_records)}) + '\n')
+            f.flush()
+
+        tasks = (
+            (image_id, image_root, info['file_name'], info['width'], info['height'], verify_decode)
+            for image_id, info in images.items()
+            if image_id not in checked_images
+        )
+        total = len(images)
+        done = len(checked_images & images.keys())
+
+        # Spawned workers do not inherit the GUI process state
+        with get_context('spawn').Pool(workers) as pool:
+            for record in pool.imap_unordered(probe_image, tasks, chunksize=chunksize):
+                f.write(json.dumps(record) + '\n')
+                summary['images_checked'] += 1
+                summary['image_issues'].update(record['issues'])
+                done += 1
+                if done % chunksize == 0:
+                    f.flush()
+                    if progress_callback:
+                        progress_callback(done, total)
+
+    if progress_callback:
+        progress_callback(total, total)
+    return summary
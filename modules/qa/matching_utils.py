@@ -0,0 +1,98 @@
+import numpy as np
+
+from .box_utils import flatten_annotations, pair_iou
+
+def candidate_pairs(gt, pred, iou_threshold, max_pairs=4_000_000):
+    # (pred, gt, iou) index pairs of the same image and class overlapping above the
+    # threshold. Every prediction is paired with all ground truth of its group, in
+    # chunks of predictions so dense images stay within bounded memory
+    num_classes = int(max(gt['category'].max(initial=0), pred['category'].max(initial=0))) + 1
+    gt_key = gt['image'] * num_classes + gt['category']
+    pred_key = pred['image'] * num_classes + pred['category']
+
+    gt_order = np.argsort(gt_key, kind='stable')
+    gt_sorted = gt_key[gt_order]
+    starts = np.searchsorted(gt_sorted, pred_key, side='left')
+    counts = np.searchsorted(gt_sorted, pred_key, side='right') - starts
+
+    # Split predictions so each chunk generates at most max_pairs pairs
+    bounds = np.searchsorted(np.cumsum(counts), np.arange(max_pairs, counts.sum(), max_pairs))
+    pairs = []
+    for chunk in np.split(np.arange(len(pred_key)), np.unique(bounds)):
+        n = counts[chunk]
+        pair_pred = np.repeat(chunk, n)
+        offsets = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        pair_gt = gt_order[np.repeat(starts[chunk], n) + offsets]
+
+        iou = pair_iou(pred['boxes'][pair_pred], gt['boxes'][pair_gt])
+        keep = iou >= iou_threshold
+        pairs.append((pair_pred[keep], pair_gt[keep], iou[keep]))
+
+    if not pairs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    return tuple(np.concatenate(arrays) for arrays in zip(*pairs))
+
+def match_predictions(gt, pred, iou_threshold=0.5):
+    # Greedy score-ordered matching: every prediction, highest score first, takes the
+    # unmatched ground truth box of its class with the highest IoU above the threshold
+    pair_pred, pair_gt, iou = candidate_pairs(gt, pred, iou_threshold)
+    pred_tp = np.zeros(len(pred['score']), dtype=bool)
+    gt_matched = np.zeros(len(gt['category']), dtype=bool)
+
+    # Pairs whose prediction and ground truth have no other candidate always match
+    unique = (
+        (np.bincount(pair_pred, minlength=len(pred_tp))[pair_pred] == 1) &
+        (np.bincount(pair_gt, minlength=len(gt_matched))[pair_gt] == 1)
+    )
+    pred_tp[pair_pred[unique]] = True
+    gt_matched[pair_gt[unique]] = True
+    pair_pred, pair_gt, iou = pair_pred[~unique], pair_gt[~unique], iou[~unique]
+
+    # Visiting the contested pairs by (score desc, prediction, IoU desc) is
+    # equivalent to the greedy loop over predictions
+    order = np.lexsort((-iou, pair_pred, -pred['score'][pair_pred]))
+    pred_done = bytearray(len(pred_tp))
+    gt_done = bytearray(len(gt_matched))
+    for p, g in zip(pair_pred[order].tolist(), pair_gt[order].tolist()):
+        if not pred_done[p] and not gt_done[g]:
+            pred_done[p] = 1
+            gt_done[g] = 1
+
+    pred_tp |= np.frombuffer(pred_done, dtype=bool)
+    gt_matched |= np.frombuffer(gt_done, dtype=bool)
+    return pred_tp, gt_matched
+
+def evaluate_predictions(gt_image_annotations, pred_image_annotations, image_ids, iou_threshold=0.5):
+    image_ids = list(image_ids)
+    gt = flatten_annotations(gt_image_annotations, image_ids)
+    pred = flatten_annotations(pred_image_annotations, image_ids)
+    pred_tp, gt_matched = match_predictions(gt, pred, iou_threshold)
+
+    # Images with any false positive or false negative
+    errors = np.zeros(len(image_ids), dtype=bool)
+    errors[pred['image'][~pred_tp]] = True
+    errors[gt['image'][~gt_matched]] = True
+
+    # Per-class counts over the whole dataset, with bincount over compact class indices
+    cat_ids, inverse = np.unique(np.concatenate([pred['category'], gt['category']]), return_inverse=True)
+    pred_index, gt_index = inverse[:len(pred_tp)], inverse[len(pred_tp):]
+    tp = np.bincount(pred_index[pred_tp], minlength=len(cat_ids))
+    fp = np.bincount(pred_index, minlength=len(cat_ids)) - tp
+    fn = np.bincount(gt_index[~gt_matched], minlength=len(cat_ids))
+
+    per_class = {}
+    for i, cat_id in enumerate(cat_ids.tolist()):
+        per_class[cat_id] = {
+            'tp': int(tp[i]),
+            'fp': int(fp[i]),
+            'fn': int(fn[i]),
+            'precision': float(tp[i] / (tp[i] + fp[i])) if tp[i] + fp[i] else 0.0,
+            'recall': float(tp[i] / (tp[i] + fn[i])) if tp[i] + fn[i] else 0.0
+        }
+
+    return {
+        'tp_predictions': {ann_id for ann_id, tp in zip(pred['id'], pred_tp.tolist()) if tp},
+        'matched_gt': {ann_id for ann_id, matched in zip(gt['id'], gt_matched.tolist()) if matched},
+        'error_images': [image_ids[i] for i in np.flatnonzero(errors)],
+        'per_class': per_class
+    }
@@ -0,0 +1,42 @@
+import numpy as np
+
+from modules.export.histogram_utils import build_image_class_counts
+
+def lookup_counts(keys, counts, query):
+    # Counts of the query keys in sorted (key, count) arrays, 0 when missing
+    if not len(keys):
+        return np.zeros(len(query), dtype=np.int64)
+    position = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+    return np.where(keys[position] == query, counts[position], 0)
+
+def find_set_disagreements(image_ids, annotation_sets):
+    # Images where annotation sets disagree with the first set, annotation_sets are
+    # {image_id: [annotations]} in a shared image and category id space
+    category_ids = sorted({
+        ann['category_id'] for image_annotations in annotation_sets
+        for anns in image_annotations.values() for ann in anns
+    })
+    category_mapping = {cat_id: i for i, cat_id in enumerate(category_ids)}
+    num_classes = max(len(category_ids), 1)
+
+    # Sorted image * class keys with their box counts, per set
+    histograms = []
+    for image_annotations in annotation_sets:
+        image_class_counts = build_image_class_counts(image_ids, image_annotations, category_mapping)
+        keys = image_class_counts['image'] * num_classes + image_class_counts['classes']
+        totals = np.bincount(image_class_counts['image'], weights=image_class_counts['counts'], minlength=len(image_ids))
+        histograms.append((keys, image_class_counts['counts'], totals))
+
+    count_mismatch = np.zeros(len(image_ids), dtype=bool)
+    class_mismatch = np.zeros(len(image_ids), dtype=bool)
+    base_keys, base_counts, base_totals = histograms[0]
+    for keys, counts, totals in histograms[1:]:
+        count_mismatch |= totals != base_totals
+        union = np.union1d(base_keys, keys)
+        differs = lookup_counts(base_keys, base_counts, union) != lookup_counts(keys, counts, union)
+        class_mismatch[union[differs] // num_classes] = True
+
+    return {
+        'count_mismatch': [image_id for image_id, differs in zip(image_ids, count_mismatch.tolist()) if differs],
+        'class_mismatch': [image_id for image_id, differs in zip(image_ids, class_mismatch.tolist()) if differs]
+    }